@@ -1,7 +1,23 @@
+from bisect import bisect_right
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from itertools import accumulate
 from math import inf
-from random import random, shuffle
+from multiprocessing import get_context
+from time import perf_counter
+from typing import Iterator
+import numpy as np
 from utils.base import Base
+from utils.local_search import LocalSearch
+from utils.distance import DenseDistance, DistanceMatrix
+from utils.partition import Partition
 from utils.path import Path
+from utils.pheromone import PheromoneMatrix
+from utils.shared import SharedArray
+from utils.spatial import GridIndex
+from utils.strategy import AntSystem
+from utils.telemetry import IterationStats, Observer, Profiler
 
 
 class ACO(Base):
@@ -31,84 +47,782 @@ class ACO(Base):
     `q: float` PHEROMONE INTENSITY\n
     The pheromone intensity Q, which represents the total pheromone,
     affects the convergence speed of the alghoritm to a certain extent.\n
+    -----
+    `backend: str` COLONY ENGINE\n
+    `"numpy"` builds the tours of all ants of an iteration together as a batch of NumPy arrays,
+    `"python"` builds them one ant at a time and is kept as a reference implementation.
+    Only the NumPy engine with a single worker runs on the condensed and on-demand distance storages picked
+    for large instances, it then calculates τ^α·η^β from the distances of the edges it evaluates
+    instead of keeping n×n heuristic and choice-info matrices.\n
+    -----
+    `nn: int` CANDIDATE LIST SIZE\n
+    When positive, every construction step only considers the `nn` nearest unvisited neighbours
+    of the current point and falls back to all unvisited points once they are all visited.
+    The candidate lists are built once per run.\n
+    -----
+    `workers: int` NUMBER OF WORKER PROCESSES\n
+    When greater than one, the NumPy engine spreads the ants of every iteration over a process pool.
+    The workers read the pheromone and choice-info matrices from shared memory, the lengths of the tours
+    are evaluated in the main process.\n
+    -----
+    `seed: int | np.random.Generator` RANDOM SEED\n
+    Seeds the NumPy random generator of both engines, so runs are reproduced bit for bit, whatever the number of workers.
+    A given generator is drawn from by every run instead. The random numbers of an iteration are drawn at once,
+    a row per ant, and every ant takes its own row wherever its tour is built.\n
+    -----
+    `ls: str` LOCAL SEARCH\n
+    Improves the iteration-best path (`"best"`) or the paths of all ants (`"all"`) with 2-opt and Or-opt
+    moves before the pheromone update. The moves use the candidate lists, or `LS_NN` nearest neighbours
+    if candidate lists are disabled.\n
+    -----
+    `strategy: AntSystem` PHEROMONE UPDATE STRATEGY\n
+    Classic Ant System by default, or `MaxMinAntSystem` and `AntColonySystem` from `utils.strategy`.
+    `MaxMinAntSystem` evaporates by its own slow rate, ignoring ρ, so it needs longer runs than Ant System
+    and pays off over hundreds of iterations or with local search. A strategy instance is reset at the start of every run.\n
+    -----
+    `time_limit: float` TIME BUDGET\n
+    Stops the algorithm after the iteration that exceeded the given number of seconds.\n
+    -----
+    `patience: int` STAGNATION LIMIT\n
+    Stops the algorithm after the given number of iterations without a shorter path.\n
+    -----
+    `observer: Observer` TELEMETRY\n
+    Receives the phase timings, work counters, path lengths and pheromone entropy of every iteration,
+    see `utils.telemetry`. Nothing is measured without an observer.\n
     """
 
-    def __init__(self, ants: int, iter: int, a: float, b: float, p: float, q: float) -> None:
+    BACKENDS = ("numpy", "python")
+    LOCAL_SEARCH = (None, "best", "all")
+    LS_NN = 10
+
+    def __init__(self, ants: int, iter: int, a: float, b: float, p: float, q: float, backend: str = "numpy",
+                 nn: int = 0, workers: int = 1, seed: int | np.random.Generator = None, ls: str = None, strategy: AntSystem = None,
+                 time_limit: float = None, patience: int = None, observer: Observer = None) -> None:
         """Initializes the hyperparameters for the algorithm."""
 
+        if backend not in ACO.BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {ACO.BACKENDS}")
+        if ls not in ACO.LOCAL_SEARCH:
+            raise ValueError(f"Unknown local search {ls!r}, expected one of {ACO.LOCAL_SEARCH}")
+        strategy = strategy if strategy is not None else AntSystem()
+        if strategy.LOCAL and workers > 1:
+            raise ValueError("Strategies with a local pheromone update build the ants sequentially, use workers=1")
         self.ants = ants
         self.iter = iter
         self.a = a
         self.b = b
         self.p = p
         self.q = q
+        self.backend = backend
+        self.nn = nn
+        self.workers = workers
+        self.seed = seed
+        self.ls = ls
+        self.strategy = strategy
+        self.time_limit = time_limit
+        self.patience = patience
+        self.observer = observer
+        self.trails: PheromoneMatrix | None = None
+        self._cancelled = False
 
     @staticmethod
-    def __select_i(selection: list[int]) -> int:
-        """Selects a random index of the next 2D point."""
+    def __select_i(selection: list[float], u: float, g: float, q0: float = 0.0) -> int:
+        """
+        Selects a random index of the next 2D point with the uniform draw `u`,
+        the most attractive one if the draw `g` is below `q0`.
+        """
 
-        sum_num = sum(selection)
-        if sum_num == 0:
+        if q0 > 0 and g < q0:
+            return max(range(len(selection)), key=selection.__getitem__)
+        cum = list(accumulate(selection))
+        if cum[-1] == 0:
             return len(selection) - 1
-        tmp_num = random()
-        prob = 0
-        for i in range(len(selection)):
-            prob += selection[i] / sum_num
-            if prob >= tmp_num:
-                return i
+        return bisect_right(cum, u * cum[-1])
+
+    @staticmethod
+    def __select_i_batch(selection: np.ndarray, valid: np.ndarray, u: np.ndarray, g: np.ndarray | None,
+                         q0: float = 0.0) -> np.ndarray:
+        """
+        Selects a random valid column in every row of weights with the uniform draws `u`,
+        the largest one where `g` is below `q0`, as `__select_i` does over the valid columns of a row:
+        the last valid column is taken where all of their weights are zero.
+        """
+
+        selection = np.where(valid, selection, 0.0)
+        cum = np.cumsum(selection, axis=1)
+        total = cum[:, -1]
+        selected_i = np.argmax(cum > (u * total)[:, None], axis=1)
+        empty = total <= 0
+        if empty.any():
+            selected_i[empty] = valid.shape[1] - 1 - np.argmax(valid[empty, ::-1], axis=1)
+        if q0 > 0:
+            greedy = g < q0
+            selected_i[greedy] = np.argmax(np.where(valid[greedy], selection[greedy], -np.inf), axis=1)
+        return selected_i
+
+    def _generator(self) -> np.random.Generator:
+        """Returns the random generator of a run: the given one, or a new one from the seed."""
+
+        return self.seed if isinstance(self.seed, np.random.Generator) else np.random.default_rng(self.seed)
+
+    def _draws(self, rng: np.random.Generator, l: int) -> np.ndarray:
+        """
+        Draws the uniform numbers of one iteration over `l` points at once, a row per ant:
+        the start point and the roulette of every step, then the greedy choice of every step if `q0` is positive.
+        """
+
+        return rng.random((self.ants, 2 * l if self.strategy.q0 > 0 else l))
+
+    @staticmethod
+    def _candidate_lists(points: list[tuple[int, int]] | None, k: int, dm: DistanceMatrix = None) -> np.ndarray | None:
+        """
+        Builds the list of `k` nearest neighbours of every 2D point, once per run.
+        External or directed distances are searched in the rows of `dm` instead of around the coordinates.
+        """
+
+        l = len(dm) if dm is not None else len(points)
+        if k <= 0 or l < 2:
+            return None
+        if points is not None and (dm is None or dm.symmetric):
+            return GridIndex(points).candidate_lists(k)
+        k = min(k, l - 1)
+        cand = np.empty((l, k), dtype=np.intp)
+        for i in range(l):
+            row = np.array(dm.row(i), dtype=float)
+            row[i] = np.inf
+            near = np.argpartition(row, k - 1)[:k]
+            cand[i] = near[np.argsort(row[near], kind="stable")]
+        return cand
+
+    def _local_search(self, points: list[tuple[int, int]] | None, dm: DistanceMatrix, cand: np.ndarray | None) -> LocalSearch | None:
+        """Prepares the local search stage, once per run."""
+
+        if self.ls is None:
+            return None
+        if not dm.symmetric:
+            raise ValueError("Local search requires a symmetric distance matrix")
+        return LocalSearch(dm, cand if cand is not None else ACO._candidate_lists(points, ACO.LS_NN, dm))
+
+    def _heuristic_matrix(self, dm: DistanceMatrix) -> list[list[float]]:
+        """Calculates the heuristic matrix η^β from the distance matrix, once per run."""
+
+        return [[(1 / max(d, 10**-5)) ** self.b for d in row.tolist()] for row in dm]
+
+    def _choice_matrix(self, pm: PheromoneMatrix, hm: list[list[float]]) -> list[list[float]]:
+        """Calculates the choice-info matrix τ^α·η^β from the stored pheromone trails."""
+
+        return [[(t ** self.a) * h for t, h in zip(pm_row, hm_row)] for pm_row, hm_row in zip(pm.dense(raw=True).tolist(), hm)]
 
-    def __create_indx(self, dm: list[list[float]], pm: list[list[float]]) -> list[int]:
-        """Creates a new ordering of 2D point indices based on the distance and pheromone."""
+    def __refresh_choice(self, cm: list[list[float]], pm: PheromoneMatrix, hm: list[list[float]]) -> None:
+        """Recalculates the choice-info matrix only on the edges changed since the last refresh."""
 
-        l = len(dm)
+        i_indx, j_indx = pm.touched()
+        for i, j, t in zip(i_indx.tolist(), j_indx.tolist(), pm.raw(i_indx, j_indx).tolist()):
+            cm[i][j] = (t ** self.a) * hm[i][j]
+            if pm.symmetric:
+                cm[j][i] = (t ** self.a) * hm[j][i]
+
+    def __create_indx(self, cm: list[list[float]], draws: list[float], cand: list[list[int]] = None, step=None,
+                      counters: dict[str, int] = None) -> list[int]:
+        """
+        Creates a new ordering of 2D point indices based on the choice-info matrix and the ant's row of `_draws`.
+        `step` is called with every used edge right after it is chosen.
+        The evaluated edges and roulette draws are added to `counters` if given.
+        """
+
+        l = len(cm)
+        q0 = self.strategy.q0
+        start = min(int(draws[0] * l), l - 1)
         unvisited_indx = list(range(l))
-        shuffle(unvisited_indx)
-        visited_indx = [unvisited_indx.pop()]
-        for _ in range(l - 1):
+        unvisited_indx.remove(start)
+        visited_indx = [start]
+        visited = [False] * l
+        visited[start] = True
+        for k in range(1, l):
             i = visited_indx[-1]
-            selection = []
-            for j in unvisited_indx:
-                selection.append(
-                    (pm[i][j] ** self.a) * ((1 / max(dm[i][j], 10**-5)) ** self.b)
-                )
-            selected_i = ACO.__select_i(selection)
-            visited_indx.append(unvisited_indx.pop(selected_i))
+            row = cm[i]
+            u, g = draws[k], draws[l + k] if q0 > 0 else 1.0
+            options = [j for j in cand[i] if not visited[j]] if cand is not None else None
+            if options:
+                j = options[ACO.__select_i([row[j] for j in options], u, g, q0)]
+                unvisited_indx.remove(j)
+            else:
+                j = unvisited_indx.pop(ACO.__select_i([row[j] for j in unvisited_indx], u, g, q0))
+            if counters is not None:
+                counters["edges"] += len(options) if options else len(unvisited_indx) + 1
+                counters["draws"] += 1
+            visited[j] = True
+            visited_indx.append(j)
+            if step is not None:
+                step(i, j)
         visited_indx.append(visited_indx[0])
         return visited_indx
 
-    def update_pm(self, pm: list[list[float]], tmp_indx: list[list[int]], tmp_leng: list[float]) -> None:
-        """Updates the pheromone matrix."""
+    @staticmethod
+    def _create_indx_batch(choice: np.ndarray, draws: np.ndarray, cand: np.ndarray = None, q0: float = 0.0,
+                           step=None, counters: dict[str, int] = None) -> np.ndarray:
+        """
+        Creates new orderings of 2D point indices for a batch of ants at once, one row per ant and per row of `_draws`.
+        `step` is called with the edges used by all ants right after every construction step.
+        The evaluated edges and roulette draws are added to `counters` if given.
+        """
 
-        l = len(pm)
-        for i in range(l):
-            for j in range(i, l):
-                pm[i][j] *= 1 - self.p
-                pm[j][i] *= 1 - self.p
-        for i in range(self.ants):
-            delta = self.q / tmp_leng[i]
-            indx = tmp_indx[i]
-            for j in range(l):
-                pm[indx[j]][indx[j + 1]] += delta
-                pm[indx[j + 1]][indx[j]] += delta
+        l = len(choice)
+        ants = len(draws)
+        rows = np.arange(ants)
+        visited = np.zeros((ants, l), dtype=bool)
+        tours = np.empty((ants, l + 1), dtype=np.int32)
+        tours[:, 0] = np.minimum(draws[:, 0] * l, l - 1)
+        visited[rows, tours[:, 0]] = True
+        for k in range(1, l):
+            current = tours[:, k - 1]
+            u, g = draws[:, k], draws[:, l + k] if q0 > 0 else None
+            if cand is not None:
+                options = cand[current]
+                valid = ~visited[rows[:, None], options]
+                # only ants whose candidates are all visited fall back to every unvisited point
+                stuck = ~valid.any(axis=1)
+                selected_i = ACO.__select_i_batch(choice[current[:, None], options], valid, u, g, q0)
+                selected_i = options[rows, selected_i]
+            else:
+                stuck = np.ones(ants, dtype=bool)
+                selected_i = np.empty(ants, dtype=np.intp)
+            if stuck.any():
+                selected_i[stuck] = ACO.__select_i_batch(choice[current[stuck]], ~visited[stuck], u[stuck],
+                                                         g[stuck] if g is not None else None, q0)
+            if counters is not None:
+                # unvisited edges only, as the one-ant engine evaluates them
+                unvisited = int((~visited[stuck]).sum())
+                if cand is not None:
+                    unvisited += int((~visited[rows[~stuck, None], options[~stuck]]).sum())
+                counters["edges"] += unvisited
+                counters["draws"] += ants
+            tours[:, k] = selected_i
+            visited[rows, selected_i] = True
+            if step is not None:
+                step(current, selected_i)
+        tours[:, l] = tours[:, 0]
+        return tours
 
-    def run(self, points: list[tuple[int, int]], name: str = None) -> Path:
+    def update_pm(self, pm: PheromoneMatrix, tmp_indx: list[list[int]] | np.ndarray, tmp_leng: list[float] | np.ndarray) -> bool:
+        """
+        Updates the pheromone matrix with the paths of one iteration using the update strategy.
+        Returns True if every trail changed and the choice-info matrix has to be rebuilt.
+        """
+
+        rebuild = self.strategy.begin(pm)
+        self.strategy.offer(pm, tmp_indx, tmp_leng)
+        return self.strategy.end(pm) or rebuild
+
+    def cancel(self) -> None:
+        """Asks a running solve, possibly on another thread, to stop after the current iteration."""
+
+        self._cancelled = True
+
+    def _stop(self, started: float, stale: int) -> bool:
+        """Checks the cancellation, the time budget and the stagnation limit after an iteration."""
+
+        if self._cancelled:
+            return True
+        if self.time_limit is not None and perf_counter() - started >= self.time_limit:
+            return True
+        return self.patience is not None and stale >= self.patience
+
+    def __observe(self, prof: Profiler, pm: PheromoneMatrix, k: int, started: float, leng, res_leng: float) -> None:
+        """Reports the telemetry of an iteration to the observer, the time spent here is not measured."""
+
+        leng = np.asarray(leng, dtype=float)
+        prof.counters["writes"] += pm.writes - prof.writes
+        prof.writes = pm.writes
+        entropy = pm.entropy()
+        timings, counters = prof.take()
+        self.observer.iteration(IterationStats(iteration=k, elapsed=perf_counter() - started, best=float(leng.min()),
+                                               mean=float(leng.mean()), worst=float(leng.max()), best_so_far=res_leng,
+                                               entropy=entropy, timings=timings, counters=counters))
+
+    def run(self, points: list[tuple[int, int]] | None, name: str = None, trails: np.ndarray = None,
+            indx: list[int] = None, dm: DistanceMatrix = None, hm: np.ndarray = None) -> Path:
         """Runs the algorithm for the given 2D points."""
 
-        l = len(points)
-        dm = ACO._distance_matrix(points)
-        pm = [[1 for _ in range(l)] for _ in range(l)]
-        res_indx = []
-        res_leng = inf
-        for _ in range(self.iter):
-            tmp_indx = []
-            tmp_leng = []
-            for _ in range(self.ants):
-                indx = self.__create_indx(dm, pm)
-                tmp_indx.append(indx)
-                tmp_leng.append(ACO._calculate_dist(dm, indx))
-            self.update_pm(pm, tmp_indx, tmp_leng)
-            best_leng = min(tmp_leng)
-            if best_leng < res_leng:
-                res_leng = best_leng
-                res_indx = tmp_indx[tmp_leng.index(best_leng)]
-        return Path(indx=res_indx, leng=res_leng, name=name)
+        path = Path.from_indx([], leng=inf, name=name)
+        for path in self.solve(points, name, trails, indx, dm, hm):
+            pass
+        return path
+
+    def solve(self, points: list[tuple[int, int]] | None, name: str = None, trails: np.ndarray = None,
+              indx: list[int] = None, dm: DistanceMatrix = None, hm: np.ndarray = None) -> Iterator[Path]:
+        """
+        Runs the algorithm for the given 2D points, yielding every new best path as soon as it is found.
+        Closing the generator cancels the remaining iterations.\n
+        A warm start is given by the n×n pheromone `trails` and the closed path `indx` of a previous solve,
+        the path is yielded first as the best of iteration 0.
+        The trails of the latest solve are kept in `self.trails`.\n
+        A precomputed distance matrix `dm` of the points and heuristic matrix `hm` = η^β for the current `b`
+        skip their calculation. An external `dm`, for example road distances loaded with `DistanceMatrix.load`,
+        may be directed, and `points` may then be None. Directed matrices keep a separate trail for each direction.
+        """
+
+        self._cancelled = False
+        if self.backend == "numpy":
+            return self.__solve_batch(points, name, trails, indx, dm, hm)
+        return self.__solve(points, name, trails, indx, dm, hm)
+
+    def __start(self, points: list[tuple[int, int]], trails: np.ndarray | None, indx: list[int] | None,
+                dm: DistanceMatrix | None, prof: Profiler | None) -> tuple[DistanceMatrix, PheromoneMatrix, float]:
+        """Prepares the distance and pheromone matrices of a run, applying the warm start if any."""
+
+        dm = dm if dm is not None else ACO._distance_matrix(points)
+        if prof is not None:
+            prof.lap("distance")
+        pm = PheromoneMatrix(len(dm), self.strategy.start(self.p, self.q, dm), dm.symmetric)
+        if trails is not None:
+            pm.load(trails)
+        leng = inf
+        if indx:
+            leng = float(ACO._calculate_dist_batch(dm, np.array([indx]))[0])
+            self.strategy.offer(pm, indx, leng)
+        pm.touched()
+        self.trails = pm
+        return dm, pm, leng
+
+    def __solve(self, points: list[tuple[int, int]] | None, name: str = None, trails: np.ndarray = None,
+                indx: list[int] = None, dm: DistanceMatrix = None, hm: np.ndarray = None) -> Iterator[Path]:
+        """Runs the pure-Python engine for the given 2D points."""
+
+        started = perf_counter()
+        prof = Profiler() if self.observer is not None else None
+        dm, pm, res_leng = self.__start(points, trails, indx, dm, prof)
+        if hm is None and not isinstance(dm, DenseDistance):
+            raise ValueError(f"The python backend needs a dense distance matrix, got {type(dm).__name__}, "
+                             "use the numpy backend")
+        hm = hm.tolist() if hm is not None else self._heuristic_matrix(dm)
+        cm = self._choice_matrix(pm, hm)
+        cand = ACO._candidate_lists(points, self.nn, dm)
+        ls = self._local_search(points, dm, cand)
+        cand = cand.tolist() if cand is not None else None
+        res_indx = list(indx) if indx else []
+        rng = self._generator()
+        if prof is not None:
+            prof.lap("setup")
+        if res_indx:
+            yield Path.from_indx(res_indx, leng=res_leng, name=name, iteration=0, elapsed=perf_counter() - started)
+            if prof is not None:
+                prof.skip()
+
+        def step(i: int, j: int) -> None:
+            self.strategy.local_update(pm, i, j)
+            t = pm.raw(i, j) ** self.a
+            cm[i][j] = t * hm[i][j]
+            if pm.symmetric:
+                cm[j][i] = t * hm[j][i]
+
+        counters = prof.counters if prof is not None else None
+        lengs = []
+
+        def deposit(indx: list[int], leng: float) -> None:
+            nonlocal res_indx, res_leng
+            self.strategy.offer(pm, indx, leng)
+            if leng < res_leng:
+                res_leng = leng
+                res_indx = indx
+            if prof is not None:
+                lengs.append(leng)
+                prof.lap("update")
+
+        if prof is not None:
+            self.observer.start(self, len(dm))
+            prof.writes = pm.writes
+            prof.skip()
+        try:
+            stale = 0
+            for k in range(self.iter):
+                prev_leng = res_leng
+                rebuild = self.strategy.begin(pm)
+                held = None
+                for draws in self._draws(rng, len(cm)).tolist():
+                    indx = self.__create_indx(cm, draws, cand, step if self.strategy.LOCAL else None, counters)
+                    if prof is not None:
+                        prof.lap("construct")
+                    if self.ls == "all":
+                        indx = ls.improve(indx)
+                        if prof is not None:
+                            prof.lap("local_search")
+                    leng = float(ACO._calculate_dist(dm, indx))
+                    if prof is not None:
+                        prof.lap("evaluate")
+                    if self.ls == "best" and (held is None or leng < held[1]):
+                        held, prev = (indx, leng), held
+                        if prev is None:
+                            continue
+                        indx, leng = prev
+                    deposit(indx, leng)
+                if held is not None:
+                    indx = ls.improve(held[0])
+                    if prof is not None:
+                        prof.lap("local_search")
+                    leng = float(ACO._calculate_dist(dm, indx))
+                    if prof is not None:
+                        prof.lap("evaluate")
+                    deposit(indx, leng)
+                if self.strategy.end(pm) or rebuild:
+                    if prof is not None:
+                        prof.lap("update")
+                    pm.touched()
+                    cm = self._choice_matrix(pm, hm)
+                else:
+                    if prof is not None:
+                        prof.lap("update")
+                    self.__refresh_choice(cm, pm, hm)
+                stale = stale + 1 if res_leng >= prev_leng else 0
+                if prof is not None:
+                    prof.lap("refresh")
+                    self.__observe(prof, pm, k + 1, started, lengs, res_leng)
+                    lengs.clear()
+                if not stale:
+                    yield Path.from_indx(res_indx, leng=res_leng, name=name, iteration=k + 1, elapsed=perf_counter() - started)
+                    if prof is not None:
+                        prof.skip()
+                if self._stop(started, stale):
+                    break
+        finally:
+            if prof is not None:
+                self.observer.finish()
+
+    def __solve_batch(self, points: list[tuple[int, int]] | None, name: str = None, trails: np.ndarray = None,
+                      indx: list[int] = None, dm: DistanceMatrix = None, hm: np.ndarray = None) -> Iterator[Path]:
+        """Runs the NumPy engine for the given 2D points."""
+
+        started = perf_counter()
+        prof = Profiler() if self.observer is not None else None
+        dm, pm, res_leng = self.__start(points, trails, indx, dm, prof)
+        lazy = hm is None and not isinstance(dm, DenseDistance)
+        if lazy:
+            if self.workers > 1:
+                raise ValueError(f"Workers need a dense distance matrix, got {type(dm).__name__}, use workers=1")
+            cm = _LazyChoice(dm, pm, self.a, self.b)
+        else:
+            hm = hm if hm is not None else (1 / np.maximum(dm.dense(), 10**-5)) ** self.b
+            cm = (pm.dense(raw=True) ** self.a) * hm
+        cand = ACO._candidate_lists(points, self.nn, dm)
+        ls = self._local_search(points, dm, cand)
+        rng = self._generator()
+        shared = []
+        pool = None
+        if self.workers > 1:
+            shared = [SharedArray.create(m) for m in (pm.data, cm)]
+            pm.data, cm = shared[0].array, shared[1].array
+            pool = ProcessPoolExecutor(self.workers, initializer=_attach_colony,
+                                       initargs=(tuple(s.spec for s in shared), cand, self.strategy.q0))
+
+        def refresh(i: np.ndarray, j: np.ndarray) -> None:
+            if lazy:
+                return
+            t = pm.raw(i, j) ** self.a
+            cm[i, j] = t * hm[i, j]
+            if pm.symmetric:
+                cm[j, i] = t * hm[j, i]
+
+        def step(i: np.ndarray, j: np.ndarray) -> None:
+            self.strategy.local_update(pm, i, j)
+            refresh(i, j)
+
+        counters = prof.counters if prof is not None else None
+        if prof is not None:
+            prof.lap("setup")
+            self.observer.start(self, len(dm))
+            prof.writes = pm.writes
+            prof.skip()
+        try:
+            if indx:
+                yield Path.from_indx(list(indx), leng=res_leng, name=name, iteration=0, elapsed=perf_counter() - started)
+                if prof is not None:
+                    prof.skip()
+            stale = 0
+            for k in range(self.iter):
+                draws = self._draws(rng, len(dm))
+                if pool is not None:
+                    chunks = [c for c in np.array_split(draws, self.workers) if len(c)]
+                    results = list(pool.map(_create_indx_chunk, chunks, [counters is not None] * len(chunks)))
+                    tours = np.concatenate([tours for tours, _ in results])
+                    if counters is not None:
+                        for _, chunk in results:
+                            for key, count in chunk.items():
+                                counters[key] += count
+                else:
+                    tours = ACO._create_indx_batch(cm, draws, cand, self.strategy.q0,
+                                                   step if self.strategy.LOCAL else None, counters)
+                if prof is not None:
+                    prof.lap("construct")
+                leng = ACO._calculate_dist_batch(dm, tours)
+                if prof is not None:
+                    prof.lap("evaluate")
+                if ls is not None:
+                    rows = np.arange(self.ants) if self.ls == "all" else np.array([np.argmin(leng)])
+                    for r in rows.tolist():
+                        tours[r] = ls.improve(tours[r].tolist())
+                    if prof is not None:
+                        prof.lap("local_search")
+                    leng[rows] = ACO._calculate_dist_batch(dm, tours[rows])
+                    if prof is not None:
+                        prof.lap("evaluate")
+                rebuild = self.update_pm(pm, tours, leng)
+                if prof is not None:
+                    prof.lap("update")
+                if rebuild:
+                    pm.touched()
+                    if not lazy:
+                        cm[...] = (pm.dense(raw=True) ** self.a) * hm
+                else:
+                    refresh(*pm.touched())
+                best = int(np.argmin(leng))
+                improved = leng[best] < res_leng
+                stale = 0 if improved else stale + 1
+                if improved:
+                    res_leng = float(leng[best])
+                if prof is not None:
+                    prof.lap("refresh")
+                    self.__observe(prof, pm, k + 1, started, leng, res_leng)
+                if improved:
+                    yield Path(order=tours[best, :-1], leng=res_leng, name=name, iteration=k + 1,
+                               elapsed=perf_counter() - started)
+                    if prof is not None:
+                        prof.skip()
+                if self._stop(started, stale):
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            if shared:
+                # the trails outlive the run in `self.trails`, move them out of the blocks before freeing them
+                pm.data, cm = np.array(pm.data), np.array(cm)
+            for s in shared:
+                s.close()
+            if prof is not None:
+                self.observer.finish()
+
+
+class _LazyChoice:
+    """
+    Choice-info τ^α·η^β of a distance storage that is not dense, calculated from the stored trails
+    and the distances whenever it is read, indexed like the choice-info matrix by pairs or by rows.
+    """
+
+    def __init__(self, dm: DistanceMatrix, pm: PheromoneMatrix, a: float, b: float) -> None:
+        self.dm = dm
+        self.pm = pm
+        self.a = a
+        self.b = b
+
+    def __len__(self) -> int:
+        return len(self.dm)
+
+    def __getitem__(self, key) -> np.ndarray:
+        if isinstance(key, tuple):
+            i, j = key
+        else:
+            i = np.asarray(key)
+            j = np.arange(len(self.dm))
+            i = i[..., None]
+        return (self.pm.raw(i, j) ** self.a) * (1 / np.maximum(self.dm.take(i, j), 10**-5)) ** self.b
+
+
+_colony: dict[str, SharedArray | np.ndarray | float | None] = {}
+
+
+def _attach_colony(specs: tuple[tuple[str, tuple[int, ...], str], ...], cand: np.ndarray | None, q0: float) -> None:
+    """Attaches a worker process to the shared pheromone and choice-info matrices."""
+
+    _colony.update(zip(("pm", "cm"), (SharedArray.attach(spec) for spec in specs)))
+    _colony["cand"] = cand
+    _colony["q0"] = q0
+
+
+def _create_indx_chunk(draws: np.ndarray, counted: bool = False) -> tuple[np.ndarray, dict[str, int] | None]:
+    """
+    Creates the tours of a chunk of ants, given by their rows of random draws, in a worker process,
+    also returns the work counters of the chunk if `counted` is set.
+    """
+
+    counters = defaultdict(int) if counted else None
+    tours = ACO._create_indx_batch(_colony["cm"].array, draws, _colony["cand"], _colony["q0"], counters=counters)
+    return tours, counters
+
+
+class ClusteredACO(Base):
+    """
+    Divide and conquer for problems of many thousands of 2D points.
+    The points are split into spatially compact clusters of about `size` points, every cluster is solved by `aco`,
+    in `workers` parallel processes, and the clusters are visited in the order of a coarse tour over their centroids.
+    Each cluster tour is opened next to the exit of the previous cluster, and the seams of the stitched tour
+    are repaired with 2-opt and Or-opt moves over the `LS_NN` nearest neighbours of every point.
+    """
+
+    LS_NN = 8
+
+    def __init__(self, aco: ACO, size: int = 200, method: str = "hilbert", workers: int = 1) -> None:
+        """Prepares the decomposition, `method` is one of `Partition.METHODS`."""
+
+        if method not in Partition.METHODS:
+            raise ValueError(f"Unknown partition method {method!r}, expected one of {Partition.METHODS}")
+        self.aco = aco
+        self.size = size
+        self.method = method
+        self.workers = workers
+
+    def run(self, points: list[tuple[int, int]], name: str = None) -> Path:
+        """Runs the decomposition for the given 2D points."""
+
+        started = perf_counter()
+        xy = np.asarray(points, dtype=float).reshape(-1, 2)
+        if len(xy) <= self.size:
+            return self.aco.run(points, name)
+        clusters = Partition.split(xy, self.size, self.method)
+        centroids = np.array([xy[c].mean(axis=0) for c in clusters])
+        coarse = self.aco.run([tuple(c) for c in centroids]).order.tolist() if len(clusters) > 2 else list(range(len(clusters)))
+        parts = [[tuple(p) for p in xy[c]] for c in clusters]
+        if self.workers > 1:
+            with ProcessPoolExecutor(self.workers) as pool:
+                local = list(pool.map(_solve_cluster, [self.aco] * len(parts), parts))
+        else:
+            local = [_solve_cluster(self.aco, part) for part in parts]
+        tour = ClusteredACO.__stitch(xy, clusters, local, centroids, coarse)
+        dm = ACO._distance_matrix(points, "ondemand")
+        cand = GridIndex(points).candidate_lists(ClusteredACO.LS_NN)
+        indx = LocalSearch(dm, cand).improve(tour + tour[:1])
+        leng = float(ACO._calculate_dist_batch(dm, np.array([indx]))[0])
+        return Path.from_indx(indx, leng=leng, name=name, iteration=self.aco.iter, elapsed=perf_counter() - started)
+
+    @staticmethod
+    def __stitch(xy: np.ndarray, clusters: list[np.ndarray], local: list[list[int]], centroids: np.ndarray,
+                 coarse: list[int]) -> list[int]:
+        """Joins the closed cluster tours into one open tour of all points in the coarse order."""
+
+        tour = []
+        for k, c in enumerate(coarse):
+            cycle = clusters[c][local[c][:-1]]
+            anchor = xy[tour[-1]] if tour else centroids[coarse[-1]]
+            start = int(np.argmin(np.hypot(*(xy[cycle] - anchor).T)))
+            cycle = np.roll(cycle, -start)
+            target = centroids[coarse[(k + 1) % len(coarse)]]
+            forward, backward = cycle[-1], cycle[1 % len(cycle)]
+            if np.hypot(*(xy[backward] - target)) < np.hypot(*(xy[forward] - target)):
+                cycle = np.concatenate([cycle[:1], cycle[:0:-1]])
+            tour.extend(cycle.tolist())
+        return tour
+
+
+def _solve_cluster(aco: ACO, points: list[tuple[float, float]]) -> list[int]:
+    """Solves one cluster of `ClusteredACO`, returns its closed path."""
+
+    if len(points) < 3:
+        return list(range(len(points))) + [0]
+    return aco.run(points).indx
+
+
+class IslandACO(Base):
+    """
+    Island model of several colonies, each in its own process and usually with its own α, β and ρ.
+    The colonies run `interval` iterations at a time, then the best path found by any of them migrates
+    to all others as their warm start, and, when `keep` is below 1, the trails of every colony are blended
+    with those of its neighbour in a ring: τ = `keep`·τ + (1 - `keep`)·τ_neighbour.
+    Every colony runs for its own number of iterations, in total.
+    The island processes are not daemonic, so colonies with `workers` above 1 can start their own pools;
+    they are stopped when the run ends or fails.
+    """
+
+    def __init__(self, colonies: list[ACO], interval: int = 10, keep: float = 1.0, processes: bool = True) -> None:
+        """Prepares the islands, `processes` can be unset to run the colonies one after another in this process."""
+
+        if not colonies:
+            raise ValueError("At least one colony is required")
+        self.colonies = colonies
+        self.interval = interval
+        self.keep = keep
+        self.processes = processes
+
+    def run(self, points: list[tuple[int, int]], name: str = None) -> Path:
+        """Runs the islands for the given 2D points, returns the best path of all colonies."""
+
+        started = perf_counter()
+        blend = self.keep < 1
+        if self.processes:
+            context = get_context()
+            links = [context.Pipe() for _ in self.colonies]
+            workers = [context.Process(target=_island_worker, args=(child, aco, points))
+                       for (_, child), aco in zip(links, self.colonies)]
+            for worker in workers:
+                worker.start()
+            islands = [parent for parent, _ in links]
+        else:
+            islands = [_Island(aco, points) for aco in self.colonies]
+        best = Path.from_indx([], leng=inf, name=name)
+        trails = [None] * len(self.colonies)
+        try:
+            for epoch in range(-(-max(aco.iter for aco in self.colonies) // self.interval)):
+                requests = [(epoch, self.interval, best.indx or None, trails[i - 1] if blend else None, self.keep, blend)
+                            for i in range(len(islands))]
+                if self.processes:
+                    for island, request in zip(islands, requests):
+                        island.send(request)
+                    results = [island.recv() for island in islands]
+                else:
+                    results = [island.epoch(*request) for island, request in zip(islands, requests)]
+                for result in results:
+                    if isinstance(result, Exception):
+                        raise result
+                for k, (indx, leng, colony_trails) in enumerate(results):
+                    trails[k] = colony_trails
+                    if indx and leng < best.leng:
+                        best = Path.from_indx(indx, leng=leng, name=name, iteration=(epoch + 1) * self.interval,
+                                    elapsed=perf_counter() - started)
+        finally:
+            if self.processes:
+                for island in islands:
+                    try:
+                        island.send(None)
+                    except OSError:
+                        pass
+                for worker in workers:
+                    worker.join(timeout=5)
+                    if worker.is_alive():
+                        worker.terminate()
+                        worker.join()
+        return best
+
+
+class _Island:
+    """One colony of `IslandACO` with the trails it keeps between migrations."""
+
+    def __init__(self, aco: ACO, points: list[tuple[int, int]]) -> None:
+        self.aco = copy(aco)
+        self.points = points
+        self.seed = aco.seed
+        self.iter = aco.iter
+        self.trails = None
+
+    def epoch(self, epoch: int, interval: int, migrant: list[int] | None, neighbour: np.ndarray | None,
+              keep: float, blend: bool) -> tuple[list[int], float, np.ndarray | None]:
+        """Runs the next `interval` iterations warm started from the migrant path and the blended trails."""
+
+        remaining = self.iter - epoch * interval
+        if remaining <= 0:
+            return [], inf, self.trails if blend else None
+        if neighbour is not None and self.trails is not None:
+            self.trails = keep * self.trails + (1 - keep) * neighbour
+        self.aco.iter = min(interval, remaining)
+        if self.seed is not None and not isinstance(self.seed, np.random.Generator):
+            self.aco.seed = int(np.random.SeedSequence([self.seed, epoch]).generate_state(1)[0])
+        path = self.aco.run(self.points, trails=self.trails, indx=migrant)
+        self.trails = self.aco.trails.dense()
+        return path.indx, path.leng, self.trails if blend else None
+
+
+def _island_worker(conn, aco: ACO, points: list[tuple[int, int]]) -> None:
+    """Runs the epochs of one island in a worker process until it receives None, errors are sent back."""
+
+    island = _Island(aco, points)
+    while (request := conn.recv()) is not None:
+        try:
+            conn.send(island.epoch(*request))
+        except Exception as e:
+            conn.send(e)
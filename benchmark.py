@@ -0,0 +1,136 @@
+import argparse
+import json
+import os
+import resource
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from time import perf_counter
+from ant_colony import ACO
+from utils.tsplib import TSPLIB
+
+INSTANCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "instances")
+PYTHON_MAX = 500
+REPEATS = 3
+TIME_FLOOR = 0.05
+
+
+def run_case(path: str, backend: str, config: dict, repeats: int = REPEATS) -> dict:
+    """
+    Solves one instance `repeats` times in the current process with the same seed, records the best length
+    over time of the last run and the shortest wall time, so the first run also serves as a warm-up.
+    """
+
+    instance = TSPLIB.load(path)
+    aco = ACO(backend=backend, **config)
+    walls = []
+    for _ in range(max(repeats, 1)):
+        curve = []
+        started = perf_counter()
+        for best in aco.solve(instance.points, instance.name, dm=instance.dm):
+            curve.append((round(perf_counter() - started, 4), float(best.leng)))
+        walls.append(perf_counter() - started)
+    wall = min(walls)
+    return {
+        "size": len(instance.dm),
+        "wall": wall,
+        "walls": walls,
+        "tours_per_s": aco.ants * aco.iter / wall,
+        "peak_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "leng": curve[-1][1],
+        "curve": curve,
+    }
+
+
+def benchmark(names: list[str], backends: list[str], config: dict, python_max: int = PYTHON_MAX,
+              repeats: int = REPEATS) -> dict[str, dict]:
+    """
+    Runs every instance with every backend, each case in a fresh process so its peak memory is its own.
+    The pure-Python backend is skipped on instances above `python_max` points.
+    """
+
+    with open(os.path.join(INSTANCES, "optima.json"), encoding="utf-8") as f:
+        optima = json.load(f)
+    results = {}
+    for name in names:
+        path = os.path.join(INSTANCES, f"{name}.tsp")
+        size = len(TSPLIB.load(path).dm)
+        for backend in backends:
+            if backend == "python" and size > python_max:
+                continue
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(run_case, path, backend, config, repeats).result()
+            optimum = optima.get(name)
+            result["gap"] = result["leng"] / optimum - 1 if optimum else None
+            results[f"{name}/{backend}"] = result
+            gap = "-" if result["gap"] is None else f"{result['gap']:.2%}"
+            print(f"{name:>12} {backend:>7} n={size:<5} wall={result['wall']:8.2f}s "
+                  f"tours/s={result['tours_per_s']:9.1f} peak={result['peak_mib']:7.1f}MiB "
+                  f"leng={result['leng']:10.1f} gap={gap}")
+    return results
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], time_tolerance: float, gap_tolerance: float,
+            time_floor: float = TIME_FLOOR) -> list[str]:
+    """
+    Returns the regressions against the baseline: runs slower by more than `time_tolerance`
+    and by more than `time_floor` seconds, or with a worse gap.
+    """
+
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        slower = result["wall"] - base["wall"]
+        if slower > base["wall"] * time_tolerance and slower > time_floor:
+            regressions.append(f"{key}: wall time {base['wall']:.2f}s -> {result['wall']:.2f}s")
+        if result["gap"] is not None and base.get("gap") is not None and result["gap"] > base["gap"] + gap_tolerance:
+            regressions.append(f"{key}: gap {base['gap']:.2%} -> {result['gap']:.2%}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks ACO on the bundled TSPLIB instances.")
+    parser.add_argument("instances", nargs="*", help="instance names, all bundled instances by default")
+    parser.add_argument("--backends", nargs="+", default=list(ACO.BACKENDS), choices=ACO.BACKENDS)
+    parser.add_argument("--ants", type=int, default=20)
+    parser.add_argument("--iter", type=int, default=50)
+    parser.add_argument("-a", type=float, default=1.0)
+    parser.add_argument("-b", type=float, default=2.0)
+    parser.add_argument("-p", type=float, default=0.5)
+    parser.add_argument("-q", type=float, default=10.0)
+    parser.add_argument("--nn", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--python-max", type=int, default=PYTHON_MAX, help="largest instance for the python backend")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="runs per case, the shortest wall time counts")
+    parser.add_argument("--save", help="write the results as a JSON baseline")
+    parser.add_argument("--baseline", help="flag regressions against a JSON baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--time-floor", type=float, default=TIME_FLOOR, help="slowdowns in seconds always allowed")
+    parser.add_argument("--gap-tolerance", type=float, default=0.01, help="allowed absolute gap increase")
+    args = parser.parse_args()
+
+    names = args.instances or sorted((f[:-4] for f in os.listdir(INSTANCES) if f.endswith(".tsp")),
+                                     key=lambda name: os.path.getsize(os.path.join(INSTANCES, f"{name}.tsp")))
+    config = {"ants": args.ants, "iter": args.iter, "a": args.a, "b": args.b, "p": args.p, "q": args.q,
+              "nn": args.nn, "seed": args.seed}
+    results = benchmark(names, args.backends, config, args.python_max, args.repeats)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["config"] != config:
+            print("Warning: the baseline was recorded with a different configuration", file=sys.stderr)
+        regressions = compare(results, baseline["results"], args.time_tolerance, args.gap_tolerance,
+                              args.time_floor)
+        for regression in regressions:
+            print("REGRESSION", regression, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
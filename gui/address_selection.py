@@ -1,13 +1,20 @@
 import tkinter as tk
 from tkinter import ttk
+from gui.virtual_list import VirtualList
+from utils.spatial import GridIndex
 from typing import Optional, Any
 
 
 class AddressSelectionWindow:
     """
     Window for selecting addresses and their coordinates.
+    The list only materializes its visible rows, addresses can also be selected within a rectangle
+    or a radius through a spatial index of the catalogue.
+    Selection changes within `BATCH_MS` reach the controller as one update.
     """
 
+    BATCH_MS = 150
+
     def __init__(self, master: tk.Tk, controller: Any) -> None:
         self.master = master
         self.controller = controller
@@ -15,26 +22,56 @@ class AddressSelectionWindow:
 
         ttk.Label(master, text="Выберите адреса доставки из списка").pack(side=tk.TOP, pady=10)
 
-        self.tree = ttk.Treeview(master, columns=("name", "x", "y"), show="headings", selectmode="extended")
-        self.tree.heading('name', text='Название')
-        self.tree.heading('x', text='X')
-        self.tree.heading('y', text='Y')
-        self.tree.column('name', width=200, anchor='w')
-        self.tree.column('x', width=50, anchor='center')
-        self.tree.column('y', width=50, anchor='center')
-        self.tree.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-        self.tree.bind("<<TreeviewSelect>>", self.on_selection_change)
+        self.addresses = self.controller.address_list
+        self.index = GridIndex(self.addresses.xy, per_cell=16)
+        self.list = VirtualList(master, {"name": ("Название", 200, "w"), "x": ("X", 50, "center"), "y": ("Y", 50, "center")},
+                                len(self.addresses), self.addresses.rows, self.on_selection_change)
+        self.list.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
-        self.addresses: list[tuple[str, int, int]] = self.controller.address_list
-        for address in self.addresses:
-            self.tree.insert("", "end", values=address)
+        area = ttk.Frame(master)
+        area.pack(side=tk.TOP, fill=tk.X, padx=10, pady=(10, 0))
+        self.area_vars = {key: tk.StringVar() for key in ("x0", "y0", "x1", "y1", "r")}
+        for column, (key, text) in enumerate((("x0", "X"), ("y0", "Y"), ("x1", "X2"), ("y1", "Y2"), ("r", "R"))):
+            ttk.Label(area, text=text).grid(row=0, column=column * 2, padx=(4, 2))
+            ttk.Entry(area, textvariable=self.area_vars[key], width=6).grid(row=0, column=column * 2 + 1)
+        buttons = ttk.Frame(master)
+        buttons.pack(side=tk.TOP, pady=(6, 0))
+        ttk.Button(buttons, text="В прямоугольнике", command=self.select_rect).pack(side=tk.LEFT, padx=2)
+        ttk.Button(buttons, text="В радиусе", command=self.select_radius).pack(side=tk.LEFT, padx=2)
+        ttk.Button(buttons, text="Сбросить", command=lambda: self.list.select([])).pack(side=tk.LEFT, padx=2)
 
         self.selected_count_label = ttk.Label(master, text="Выбрано адресов: 0")
         self.selected_count_label.pack(side=tk.BOTTOM, pady=10)
+        self.pending: Optional[str] = None
+
+    def area(self, *keys: str) -> Optional[list[float]]:
+        """Returns the values of the area fields, or None if any of them is not a number."""
+        try:
+            return [float(self.area_vars[key].get()) for key in keys]
+        except ValueError:
+            return None
+
+    def select_rect(self) -> None:
+        """Adds the addresses within the rectangle (X, Y) - (X2, Y2) to the selection."""
+        values = self.area("x0", "y0", "x1", "y1")
+        if values is not None:
+            self.list.select(self.index.within_rect(values[:2], values[2:]).tolist(), add=True)
+
+    def select_radius(self) -> None:
+        """Adds the addresses within the radius R from (X, Y) to the selection."""
+        values = self.area("x0", "y0", "r")
+        if values is not None:
+            self.list.select(self.index.within_radius(values[:2], values[2]).tolist(), add=True)
+
+    def on_selection_change(self) -> None:
+        """Schedules sending the selection to the controller, later changes supersede the scheduled one."""
+        self.selected_count_label.config(text=f"Выбрано адресов: {len(self.list.selected)}")
+        if self.pending is not None:
+            self.master.after_cancel(self.pending)
+        self.pending = self.master.after(self.BATCH_MS, self.send_selection)
 
-    def on_selection_change(self, event: Optional[tk.Event] = None) -> None:
+    def send_selection(self) -> None:
         """Sends the selected addresses to the controller to update the route."""
-        selected_items = self.tree.selection()
-        selected_points = [self.tree.item(item, 'values') for item in selected_items]
-        self.selected_count_label.config(text=f"Выбрано адресов: {len(selected_items)}")
-        self.controller.update_points(selected_points)
+        self.pending = None
+        indices = sorted(self.list.selected)
+        self.controller.update_points([self.addresses[i] for i in indices], indices)
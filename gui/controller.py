@@ -1,19 +1,46 @@
 import tkinter as tk
+import numpy as np
 from gui.address_selection import AddressSelectionWindow
 from gui.route_visualization import RouteVisualizationWindow
 from gui.settings import SettingsWindow
-from utils.path import Path
+from gui.solver import BackgroundSolver
 from ant_colony import ACO
+from utils.addresses import AddressCatalogue
+from utils.catalogue import DistanceCatalogue
+from utils.distance import DenseDistance, DistanceMatrix
+from utils.path import Path
+from utils.solution_cache import SolutionCache
 from utils.tsp import TSP
+from utils.tuning import Tuning
+from utils.warm_start import WarmStart
 from typing import Optional
 
 
 class ApplicationController:
     """
     The controller for the application, coordinating interactions between windows and data processing logic.
+    Routes are calculated by a background solver, its results are polled from the tkinter main loop.
+    When only some addresses change, the colony is warm started from the previous route and pheromone
+    and runs the `WARM_RATIO` share of the configured iterations.
+    The address catalogue is an `AddressCatalogue`, or a list of `(name, x, y)` tuples,
+    and the selection is tracked by catalogue indices.
+    The distances between all catalogue addresses are calculated once at startup, or on demand for large catalogues,
+    or taken from an external matrix `distances` in the order of `address_list`, such as road distances.
+    Completed routes are kept in a solution cache, in the SQLite file `cache_path` if given:
+    a selection solved before with the same settings is shown at once, and with other settings
+    its cached route warm starts the colony.
+    Settings tuned per selection size by `tune.py` are loaded from `tuning_path` if given and applied
+    whenever the selection changes, until the settings are changed by hand.
     """
 
-    def __init__(self, address_list: list[tuple[str, int, int]], ants: int, iterations: int, alpha: float, beta: float, p: float, q: float) -> None:
+    POLL_MS = 50
+    WARM_RATIO = 0.25
+
+    def __init__(self, address_list: AddressCatalogue | list[tuple[str, int, int]], ants: int, iterations: int, alpha: float, beta: float, p: float, q: float,
+                 distances: Optional[DistanceMatrix] = None, cache_path: Optional[str] = None,
+                 tuning_path: Optional[str] = None) -> None:
+        if not isinstance(address_list, AddressCatalogue):
+            address_list = AddressCatalogue.from_list(address_list)
         self.address_list = address_list
         self.ants = ants
         self.iterations = iterations
@@ -21,6 +48,10 @@ class ApplicationController:
         self.beta = beta
         self.p = p
         self.q = q
+        self.catalogue = DistanceCatalogue(address_list.xy, dm=distances)
+        self.external = distances is not None
+        self.cache = SolutionCache(cache_path)
+        self.tuning = Tuning.load(tuning_path) if tuning_path else None
 
         self.root = tk.Tk()
         self.root2 = tk.Toplevel(self.root)
@@ -29,22 +60,35 @@ class ApplicationController:
         self.settings_window = None
 
         self.points: Optional[list[tuple[int, int]]] = None
+        self.addresses: list[str] = []
+        self.selection: list[int] = []
         self.tsp: Optional[TSP] = None
         self.aco: Optional[ACO] = None
+        self.solved: Optional[tuple[list[int], Optional[ACO], Path]] = None
+        self.solver = BackgroundSolver()
+        self.root.after(self.POLL_MS, self.poll_results)
 
     def run(self) -> None:
         """Starts the main event loop of tkinter."""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.solver.close()
+            self.cache.close()
 
-    def update_points(self,  points: list[tuple[str]]) -> None:
-        """Updates the points and creates a new TSP problem."""
+    def update_points(self, points: list[tuple[str, int, int]], indices: list[int]) -> None:
+        """Updates the points, given with their catalogue indices, and creates a new TSP problem."""
         self.points = [(int(x), int(y)) for _, x, y in points]
-        addresses = [addr for addr, _, _ in points]
-        self.tsp = TSP(self.points, addresses)
-        self.update_route()
+        self.addresses = [addr for addr, _, _ in points]
+        self.selection = list(indices)
+        if self.tuning is not None:
+            self.apply_tuning()
+        self.tsp = TSP(self.points, self.addresses, dm=self.matrices()[0])
+        self.update_route(self.warm_start())
 
     def update_settings(self, ants: int, iter: int, a: float, b: float, p: float, q: float) -> None:
-        """Updates ACO algorithm parameters and recalculates the route."""
+        """Updates ACO algorithm parameters and recalculates the route, tuned settings no longer apply."""
+        self.tuning = None
         self.ants = ants
         self.iterations = iter
         self.alpha = a
@@ -53,21 +97,68 @@ class ApplicationController:
         self.q = q
         self.update_route()
 
-    def update_route(self) -> None:
-        """Updates the route in the visualization window."""
+    def apply_tuning(self) -> None:
+        """Takes the tuned settings of the size bucket of the selection."""
+        config = self.tuning.config(len(self.points))
+        self.ants = config["ants"]
+        self.iterations = config["iter"]
+        self.alpha = config["a"]
+        self.beta = config["b"]
+        self.p = config["p"]
+        self.q = config["q"]
+
+    def update_route(self, warm: Optional[tuple[np.ndarray, list[int]]] = None) -> None:
+        """Schedules the recalculation of the route, the visualization is updated as results arrive."""
         if self.points and len(self.points) > 1:
-            best_path = self.perform_calculation()
-            if best_path:
-                print('Best Path:', best_path)
-                self.visualization_window.update_route(best_path, self.tsp)
+            self.perform_calculation(warm)
 
-    def perform_calculation(self) -> Optional[Path]:
-        """Perform the ACO calculation and update the plot."""
+    def warm_start(self) -> Optional[tuple[np.ndarray, list[int]]]:
+        """Maps the pheromone and route of the latest solve onto the selected addresses, if they share any."""
+        if not self.solved or not self.points or len(self.points) < 2:
+            return None
+        selection, aco, path = self.solved
+        if aco is None or aco.trails is None or not set(selection) & set(self.selection):
+            return None
+        dm, _ = self.matrices()
+        return WarmStart(selection, aco.trails.dense(), path.indx).adapt(self.selection, dm)
+
+    def matrices(self) -> tuple[DenseDistance, np.ndarray]:
+        """Returns the distance and heuristic matrices of the selected addresses from the catalogue."""
+        return self.catalogue.matrices(self.selection, self.beta)
+
+    def perform_calculation(self, warm: Optional[tuple[np.ndarray, list[int]]] = None) -> None:
+        """Submits the ACO calculation to the background solver, superseding the previous one."""
         if self.points and len(self.points) > 1:
-            self.aco = ACO(ants=self.ants, iter=self.iterations, a=self.alpha, b=self.beta, p=self.p, q=self.q)
-            best_path = self.aco.run(self.points)
-            return best_path
-        return None
+            dm, hm = self.matrices()
+            params = SolutionCache.params(self.ants, self.iterations, self.alpha, self.beta, self.p, self.q)
+            source = dm if self.external else None
+            context = (self.tsp, self.selection, params, source)
+            cached = self.cache.get(self.points, params, source, "ACO Path")
+            if cached is not None:
+                self.solver.cancel()
+                self.show_path(cached, context, None)
+                return
+            iterations = max(1, round(self.iterations * self.WARM_RATIO)) if warm else self.iterations
+            self.aco = ACO(ants=self.ants, iter=iterations, a=self.alpha, b=self.beta, p=self.p, q=self.q)
+            trails, indx = warm if warm else (None, self.cache.warm(self.points, source))
+            self.solver.submit(self.aco, self.points, (context, self.aco), trails=trails, indx=indx, dm=dm, hm=hm)
+
+    def poll_results(self) -> None:
+        """Shows the best-so-far paths found by the background solver, runs on the tkinter main loop."""
+        for best_path, (context, aco), final in self.solver.results():
+            if final:
+                tsp, _, params, source = context
+                self.cache.put(tsp.get_points(), params, best_path, source)
+            else:
+                self.show_path(best_path, context, aco)
+        self.root.after(self.POLL_MS, self.poll_results)
+
+    def show_path(self, path: Path, context: tuple, aco: Optional[ACO]) -> None:
+        """Shows the path found for the selection described by `context`."""
+        tsp, selection, _, _ = context
+        print('Best Path:', path)
+        self.solved = (selection, aco, path)
+        self.visualization_window.update_route(path, tsp)
 
     def open_settings(self) -> None:
         """Opens the settings window"""
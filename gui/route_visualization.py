@@ -42,7 +42,7 @@ class RouteVisualizationWindow:
     def update_route(self, path: Path, tsp: Optional[TSP]) -> None:
         """Updates the route graph and the route length label."""
         self.tsp = tsp
-        self.tsp._paths = [Path(indx=path.indx, leng=path.leng, name="ACO Path")]
+        self.tsp.set_paths([Path(order=path.order, leng=path.leng, name="ACO Path")])
         km, m = divmod(path.leng, 1000)
         if km > 0:
             self.route_length_label.config(text=f"Длина маршрута: {int(km)}км {m:.0f}м")
@@ -51,7 +51,6 @@ class RouteVisualizationWindow:
         self.update_plot()
 
     def update_plot(self) -> None:
-        """Updates the matplotlib plot with the current TSP solution."""
+        """Updates the matplotlib plot with the current TSP solution, `TSP.show` redraws only what changed."""
         if self.tsp:
             self.tsp.show(self.ax)
-            self.canvas.draw_idle()
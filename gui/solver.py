@@ -0,0 +1,103 @@
+import threading
+import traceback
+from queue import Queue, Empty
+from time import monotonic
+from typing import Any, Optional
+from ant_colony import ACO
+from utils.path import Path
+
+
+class BackgroundSolver:
+    """
+    Runs ACO solves on a background thread so the Tk main loop stays responsive.
+    Rapid submissions are debounced, and a submission cancels the solve it supersedes.
+    The best path of a solve that ran to completion is reported once more, marked as final.
+    """
+
+    def __init__(self, delay: float = 0.25) -> None:
+        """Starts the worker thread, solves begin `delay` seconds after the last submission."""
+        self.delay = delay
+        self._cond = threading.Condition()
+        self._pending: Optional[tuple[ACO, list[tuple[int, int]], Any, dict[str, Any]]] = None
+        self._submitted = 0.0
+        self._generation = 0
+        self._running: Optional[ACO] = None
+        self._closed = False
+        self._results: Queue[tuple[int, Path, Any, bool]] = Queue()
+        self._thread = threading.Thread(target=self.__work, name="aco-solver", daemon=True)
+        self._thread.start()
+
+    def submit(self, aco: ACO, points: list[tuple[int, int]], context: Any = None, **options: Any) -> None:
+        """Schedules a solve, `context` is returned together with its results and `options` go to `ACO.solve`."""
+        with self._cond:
+            self._pending = (aco, points, context, options)
+            self._submitted = monotonic()
+            self._generation += 1
+            if self._running is not None:
+                self._running.cancel()
+            self._cond.notify()
+
+    def cancel(self) -> None:
+        """Drops the pending submission and cancels the running solve, their results are discarded."""
+        with self._cond:
+            self._pending = None
+            self._generation += 1
+            if self._running is not None:
+                self._running.cancel()
+
+    def results(self) -> list[tuple[Path, Any, bool]]:
+        """
+        Returns the best-so-far paths of the latest submission found since the previous call,
+        with a flag set on the repeated best path of a completed solve.
+        """
+        items = []
+        while True:
+            try:
+                generation, path, context, final = self._results.get_nowait()
+            except Empty:
+                return items
+            if generation == self._generation:
+                items.append((path, context, final))
+
+    def close(self) -> None:
+        """Cancels the running solve and stops the worker thread."""
+        with self._cond:
+            self._closed = True
+            self._pending = None
+            if self._running is not None:
+                self._running.cancel()
+            self._cond.notify()
+
+    def __work(self) -> None:
+        """Waits for submissions and streams the results of the latest one into the results queue."""
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                while not self._closed:
+                    remaining = self._submitted + self.delay - monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+                (aco, points, context, options), self._pending = self._pending, None
+                generation = self._generation
+                self._running = aco
+            paths = aco.solve(points, **options)
+            best = None
+            try:
+                for path in paths:
+                    if generation != self._generation:
+                        break
+                    best = path
+                    self._results.put((generation, path, context, False))
+                else:
+                    if best is not None and generation == self._generation and not self._closed:
+                        self._results.put((generation, best, context, True))
+            except Exception:
+                traceback.print_exc()
+            finally:
+                paths.close()
+                with self._cond:
+                    self._running = None
@@ -0,0 +1,97 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Iterable, Optional
+
+
+class VirtualList(ttk.Frame):
+    """
+    Treeview that only holds the rows visible in its window, taken on scrolling from `rows(start, stop)`,
+    so lists of any length open and scroll at once.
+    The selection is kept as a set of row indices rather than Treeview items:
+    a click selects a row, Ctrl+click toggles it and Shift+click selects a range.
+    """
+
+    def __init__(self, master: tk.Misc, columns: dict[str, tuple[str, int, str]], count: int,
+                 rows: Callable[[int, int], list[tuple]], on_select: Callable[[], None]) -> None:
+        """`columns` maps column ids to their heading, width and anchor."""
+        super().__init__(master)
+        self.count = count
+        self.rows = rows
+        self.on_select = on_select
+        self.selected: set[int] = set()
+        self.first = 0
+        self.anchor: Optional[int] = None
+
+        self.tree = ttk.Treeview(self, columns=tuple(columns), show="headings", selectmode="none")
+        for column, (heading, width, anchor) in columns.items():
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor=anchor)
+        self.tree.tag_configure("selected", background="#4a6984", foreground="white")
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", lambda event: self.render())
+        self.tree.bind("<Button-1>", self.on_click)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll_to(self.first + (-3 if event.delta > 0 else 3)))
+        self.tree.bind("<Button-4>", lambda event: self.scroll_to(self.first - 3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_to(self.first + 3))
+        self.row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+
+    @property
+    def visible(self) -> int:
+        """Returns the number of rows that fit into the window below the headings."""
+        return max(1, self.tree.winfo_height() // self.row_height - 1)
+
+    def render(self) -> None:
+        """Fills the Treeview items with the visible rows, reusing the items of the previous rows."""
+        self.first = max(0, min(self.first, self.count - self.visible))
+        values = self.rows(self.first, self.first + self.visible)
+        items = self.tree.get_children()
+        for item in items[len(values):]:
+            self.tree.delete(item)
+        for k, row in enumerate(values):
+            tags = ("selected",) if self.first + k in self.selected else ()
+            if k < len(items):
+                self.tree.item(items[k], values=row, tags=tags)
+            else:
+                self.tree.insert("", "end", values=row, tags=tags)
+        if self.count:
+            self.scrollbar.set(self.first / self.count, min(1.0, (self.first + len(values)) / self.count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, first: int) -> None:
+        self.first = first
+        self.render()
+
+    def on_scroll(self, action: str, value: str, unit: Optional[str] = None) -> None:
+        """Handles the scrollbar commands `moveto fraction` and `scroll n units|pages`."""
+        if action == "moveto":
+            self.scroll_to(round(float(value) * self.count))
+        elif action == "scroll":
+            self.scroll_to(self.first + int(value) * (self.visible if unit == "pages" else 1))
+
+    def on_click(self, event: tk.Event) -> str:
+        """Updates the selection with the clicked row."""
+        item = self.tree.identify_row(event.y)
+        if not item:
+            return "break"
+        i = self.first + self.tree.index(item)
+        if event.state & 0x0001 and self.anchor is not None:
+            self.selected |= set(range(min(self.anchor, i), max(self.anchor, i) + 1))
+        elif event.state & 0x0004:
+            self.selected ^= {i}
+            self.anchor = i
+        else:
+            self.selected = {i}
+            self.anchor = i
+        self.render()
+        self.on_select()
+        return "break"
+
+    def select(self, indices: Iterable[int], add: bool = False) -> None:
+        """Selects the rows with the given indices, keeping the current selection if `add` is set."""
+        self.selected = (self.selected if add else set()) | {int(i) for i in indices}
+        self.render()
+        self.on_select()
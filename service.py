@@ -0,0 +1,386 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+from multiprocessing import Manager
+from statistics import mean, quantiles
+from time import monotonic, perf_counter
+from ant_colony import ACO
+
+DEFAULTS = {"ants": 20, "iter": 100, "a": 1.0, "b": 2.0, "p": 0.5, "q": 10.0}
+OPTIONS = ("backend", "nn", "seed", "ls", "time_limit", "patience")
+TERMINAL = ("done", "cancelled", "failed")
+
+
+class _JobACO(ACO):
+    """
+    Colony of a job in its worker process: reports the progress and stops once the job is cancelled,
+    checked at most every `INTERVAL` seconds from the stop check after every iteration,
+    so the job runs without the telemetry of an observer.
+    """
+
+    INTERVAL = 0.1
+
+    def __init__(self, job: int, events, cancelled, **params) -> None:
+        super().__init__(**params)
+        self.job = job
+        self.events = events
+        self.cancelled = cancelled
+        self.best_so_far = None
+        self.iteration = 0
+        self.sent = 0.0
+
+    def _stop(self, started: float, stale: int) -> bool:
+        self.iteration += 1
+        now = monotonic()
+        if now - self.sent >= self.INTERVAL:
+            self.sent = now
+            if self.cancelled.get(self.job):
+                self.cancel()
+            self.events.put((self.job, {"event": "progress", "iteration": self.iteration,
+                                        "leng": self.best_so_far, "elapsed": perf_counter() - started}))
+        return super()._stop(started, stale)
+
+
+def _solve_job(job: int, points: list[tuple[float, float]], params: dict, events, cancelled) -> dict:
+    """Solves a job in a worker process, streaming every new best path through the `events` queue."""
+
+    aco = _JobACO(job, events, cancelled, **params)
+    best = None
+    for best in aco.solve(points):
+        aco.best_so_far = best.leng
+        events.put((job, {"event": "best", "iteration": best.iteration, "leng": best.leng, "indx": best.indx,
+                          "elapsed": best.elapsed}))
+    return {"leng": best.leng, "indx": best.indx} if best is not None else {}
+
+
+class Job:
+    """A solve request, shared by all clients that sent the same points and parameters while it was active."""
+
+    def __init__(self, id: int, key: str, points: list[tuple[float, float]], params: dict, priority: int) -> None:
+        self.id = id
+        self.key = key
+        self.points = points
+        self.params = params
+        self.priority = priority
+        self.status = "queued"
+        self.created = monotonic()
+        self.started: float | None = None
+        self.finished: float | None = None
+        self.best: dict | None = None
+        self.progress: dict | None = None
+        self.error: str | None = None
+        self.subscribers: list[asyncio.Queue] = []
+
+    def snapshot(self) -> dict:
+        """Returns the state of the job as a JSON-ready dict."""
+
+        return {"event": "status", "job": self.id, "status": self.status, "priority": self.priority,
+                "size": len(self.points), "best": self.best, "progress": self.progress, "error": self.error}
+
+    def publish(self, event: dict) -> None:
+        """Records the event and passes it to all subscribed clients."""
+
+        if event["event"] == "best":
+            self.best = event
+        elif event["event"] == "progress":
+            self.progress = event
+        for queue in self.subscribers:
+            queue.put_nowait(event)
+
+
+class SolveService:
+    """
+    Local solve service: jobs wait in a priority queue, lower values first, and run `ACO` in a pool of
+    `workers` processes. A job with the same points and parameters as an active one joins it instead.
+    Clients follow jobs as streams of events, new best paths, progress and the final status,
+    and may cancel them while queued or running.
+    """
+
+    HISTORY = 1000
+
+    def __init__(self, workers: int = 2) -> None:
+        self.workers = workers
+        self.jobs: OrderedDict[int, Job] = OrderedDict()
+        self.active: dict[str, Job] = {}
+        self.counters = {"submitted": 0, "coalesced": 0, "done": 0, "cancelled": 0, "failed": 0}
+        self.waits: deque[float] = deque(maxlen=self.HISTORY)
+        self.runs: deque[float] = deque(maxlen=self.HISTORY)
+        self._ids = count(1)
+        self._order = count()
+
+    async def start(self) -> None:
+        """Starts the process pool and the background tasks, must be called from the running event loop."""
+
+        self.pool = ProcessPoolExecutor(self.workers)
+        self.manager = Manager()
+        self.events = self.manager.Queue()
+        self.cancelled = self.manager.dict()
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.slots = asyncio.Semaphore(self.workers)
+        self.tasks = [asyncio.create_task(self.__dispatch()), asyncio.create_task(self.__pump())]
+
+    async def stop(self) -> None:
+        """Cancels all jobs and shuts the pool down."""
+
+        for job in list(self.active.values()):
+            self.cancel(job.id)
+        await asyncio.get_running_loop().run_in_executor(None, self.events.put, None)
+        self.tasks[0].cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.pool.shutdown(cancel_futures=True)
+        self.manager.shutdown()
+
+    def submit(self, points: list[tuple[float, float]], params: dict, priority: int = 0) -> tuple[Job, bool]:
+        """Queues a job, returns it and whether it joined an identical active job."""
+
+        key = hashlib.sha256(json.dumps([points, sorted(params.items())]).encode()).hexdigest()
+        self.counters["submitted"] += 1
+        job = self.active.get(key)
+        if job is not None:
+            self.counters["coalesced"] += 1
+            if job.status == "queued" and priority < job.priority:
+                job.priority = priority
+                self.queue.put_nowait((priority, next(self._order), job))
+            return job, True
+        job = Job(next(self._ids), key, points, params, priority)
+        self.jobs[job.id] = job
+        self.active[key] = job
+        while len(self.jobs) > self.HISTORY:
+            oldest = next(iter(self.jobs.values()))
+            if oldest.status not in TERMINAL:
+                break
+            self.jobs.popitem(last=False)
+        self.queue.put_nowait((priority, next(self._order), job))
+        return job, False
+
+    def cancel(self, id: int) -> bool:
+        """Cancels a queued or running job, returns False if it is unknown or already finished."""
+
+        job = self.jobs.get(id)
+        if job is None or job.status in TERMINAL:
+            return False
+        if job.status == "queued":
+            self.__finish(job, "cancelled")
+            job.publish(job.snapshot())
+        else:
+            self.cancelled[job.id] = True
+            job.status = "cancelling"
+            if self.active.get(job.key) is job:
+                # identical submissions start a new job instead of joining one that is going away
+                del self.active[job.key]
+        return True
+
+    def metrics(self) -> dict:
+        """Returns the queue depth, job counters and the wait and run latencies of recent jobs in seconds."""
+
+        def latency(values) -> dict:
+            if not values:
+                return {"mean": None, "p50": None, "p95": None}
+            q = quantiles(values, n=20) if len(values) > 1 else [values[0]] * 19
+            return {"mean": mean(values), "p50": q[9], "p95": q[18]}
+
+        statuses = [job.status for job in self.active.values()]
+        return {"queue_depth": statuses.count("queued"), "running": len(statuses) - statuses.count("queued"),
+                "workers": self.workers, **self.counters, "wait": latency(list(self.waits)), "run": latency(list(self.runs))}
+
+    async def subscribe(self, id: int):
+        """Yields the state of the job and then its events until it finishes."""
+
+        job = self.jobs[id]
+        queue: asyncio.Queue = asyncio.Queue()
+        job.subscribers.append(queue)
+        try:
+            yield job.snapshot()
+            if job.status in TERMINAL:
+                return
+            while True:
+                event = await queue.get()
+                yield event
+                if event.get("status") in TERMINAL:
+                    return
+        finally:
+            job.subscribers.remove(queue)
+
+    def __finish(self, job: Job, status: str) -> None:
+        """Marks the job as finished and updates the metrics."""
+
+        job.status = status
+        job.finished = monotonic()
+        self.counters[status] += 1
+        if self.active.get(job.key) is job:
+            del self.active[job.key]
+        self.cancelled.pop(job.id, None)
+
+    async def __dispatch(self) -> None:
+        """Starts the queued jobs in priority order whenever a worker is free."""
+
+        while True:
+            await self.slots.acquire()
+            while True:
+                _, _, job = await self.queue.get()
+                if job.status == "queued":
+                    break
+            asyncio.create_task(self.__run(job))
+
+    async def __run(self, job: Job) -> None:
+        """Runs a job in the process pool, its final status is published after all of its events."""
+
+        loop = asyncio.get_running_loop()
+        job.status = "running"
+        job.started = monotonic()
+        self.waits.append(job.started - job.created)
+        job.publish(job.snapshot())
+        try:
+            result = await loop.run_in_executor(self.pool, _solve_job, job.id, job.points, job.params,
+                                                self.events, self.cancelled)
+            if result and (job.best is None or result["leng"] < job.best["leng"]):
+                job.best = {"event": "best", **result}
+            status = "cancelled" if job.status == "cancelling" else "done"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            status = "failed"
+        finally:
+            self.slots.release()
+        self.runs.append(monotonic() - job.started)
+        self.__finish(job, status)
+        await loop.run_in_executor(None, self.events.put, (job.id, None))
+
+    async def __pump(self) -> None:
+        """Passes the events of the worker processes to the jobs, None closes the pump."""
+
+        loop = asyncio.get_running_loop()
+        while (item := await loop.run_in_executor(None, self.events.get)) is not None:
+            job = self.jobs.get(item[0])
+            if job is not None:
+                job.publish(item[1] if item[1] is not None else job.snapshot())
+
+
+class HTTPFrontend:
+    """
+    Minimal HTTP/1.1 JSON interface of a `SolveService`, one request per connection:
+    * `POST /jobs` queues `{"points": [[x, y], ...], "params": {...}, "priority": 0}` and returns the job id;
+    * `POST /solve` queues the same body and streams the events of the job as JSON lines;
+    * `GET /jobs/<id>` returns the state of a job, `GET /jobs/<id>/events` streams its events;
+    * `DELETE /jobs/<id>` cancels a job;
+    * `GET /metrics` returns the queue depth, counters and latencies.
+    """
+
+    def __init__(self, service: SolveService) -> None:
+        self.service = service
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            method, target, body = await HTTPFrontend.__read(reader)
+            await self.__route(method, target.rstrip("/").split("/")[1:], body, writer)
+        except (ValueError, TypeError, KeyError) as e:
+            await HTTPFrontend.__respond(writer, 400, {"error": f"{type(e).__name__}: {e}"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def __route(self, method: str, parts: list[str], body: bytes, writer: asyncio.StreamWriter) -> None:
+        service = self.service
+        if method == "GET" and parts == ["metrics"]:
+            return await HTTPFrontend.__respond(writer, 200, service.metrics())
+        if method == "POST" and parts in (["jobs"], ["solve"]):
+            job, coalesced = service.submit(*HTTPFrontend.__parse_job(body))
+            if parts == ["jobs"]:
+                return await HTTPFrontend.__respond(writer, 202, {"job": job.id, "coalesced": coalesced})
+            return await self.__stream(writer, job.id)
+        if len(parts) in (2, 3) and parts[0] == "jobs" and parts[1].isdigit() and int(parts[1]) in service.jobs:
+            id = int(parts[1])
+            if method == "GET" and len(parts) == 2:
+                return await HTTPFrontend.__respond(writer, 200, service.jobs[id].snapshot())
+            if method == "GET" and parts[2:] == ["events"]:
+                return await self.__stream(writer, id)
+            if method == "DELETE" and len(parts) == 2:
+                return await HTTPFrontend.__respond(writer, 200, {"job": id, "cancelled": service.cancel(id)})
+        await HTTPFrontend.__respond(writer, 404, {"error": "Not found"})
+
+    async def __stream(self, writer: asyncio.StreamWriter, id: int) -> None:
+        """Streams the events of the job as chunked JSON lines."""
+
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n"
+                     b"Connection: close\r\n\r\n")
+        async for event in self.service.subscribe(id):
+            line = json.dumps(event).encode() + b"\n"
+            writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def __parse_job(body: bytes) -> tuple[list[tuple[float, float]], dict, int]:
+        """Validates the body of a solve request."""
+
+        request = json.loads(body or b"{}")
+        points = [(float(x), float(y)) for x, y in request["points"]]
+        if len(points) < 2:
+            raise ValueError("At least 2 points are required")
+        params = {**DEFAULTS, **request.get("params", {})}
+        unknown = set(params) - set(DEFAULTS) - set(OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown parameters {sorted(unknown)}")
+        ACO(**params)
+        return points, params, int(request.get("priority", 0))
+
+    @staticmethod
+    async def __read(reader: asyncio.StreamReader) -> tuple[str, str, bytes]:
+        """Reads the method, target and body of a request."""
+
+        method, target, _ = (await reader.readuntil(b"\r\n")).decode("latin-1").split(" ", 2)
+        length = 0
+        while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return method, target, await reader.readexactly(length) if length else b""
+
+    @staticmethod
+    async def __respond(writer: asyncio.StreamWriter, status: int, data: dict) -> None:
+        body = json.dumps(data).encode()
+        reason = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                     f"Connection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+
+
+async def serve(host: str, port: int, unix: str = None, workers: int = 2) -> None:
+    """Runs the service until it is cancelled."""
+
+    service = SolveService(workers)
+    await service.start()
+    frontend = HTTPFrontend(service)
+    if unix:
+        server = await asyncio.start_unix_server(frontend.handle, unix)
+    else:
+        server = await asyncio.start_server(frontend.handle, host, port)
+    print("Serving on", unix or f"http://{host}:{port}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Runs the local ACO solve service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=2, help="solver processes")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from time import perf_counter
+from ant_colony import ACO
+from utils.strategy import AntColonySystem, AntSystem, MaxMinAntSystem
+from utils.tsplib import Instance, TSPLIB
+
+STRATEGIES = {"as": AntSystem, "mmas": MaxMinAntSystem, "acs": AntColonySystem}
+
+
+def load_instance(path: str) -> Instance:
+    """Reads a CSV file of `name,x,y` rows or a TSPLIB file."""
+
+    return TSPLIB.load_csv(path) if path.lower().endswith(".csv") else TSPLIB.load(path)
+
+
+def solve_file(path: str, config: dict) -> dict:
+    """Solves one instance file and returns the result as a JSON-ready dict."""
+
+    started = perf_counter()
+    instance = load_instance(path)
+    if len(instance.dm) < 2:
+        raise ValueError(f"{path!r} has less than 2 points")
+    config = dict(config)
+    strategy = STRATEGIES[config.pop("strategy")]()
+    best = ACO(strategy=strategy, **config).run(instance.points, instance.name, dm=instance.dm)
+    result = {"file": path, "name": instance.name, "size": len(instance.dm), "leng": best.leng,
+              "indx": best.indx, "iteration": best.iteration, "elapsed": perf_counter() - started}
+    if instance.names is not None:
+        result["names"] = [instance.names[i] for i in best.indx]
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Solves TSP instances from CSV (name,x,y) or TSPLIB files, "
+                                                 "printing one JSON line per instance to stdout or --output.")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--ants", type=int, default=20)
+    parser.add_argument("--iter", type=int, default=100)
+    parser.add_argument("-a", type=float, default=1.0)
+    parser.add_argument("-b", type=float, default=2.0)
+    parser.add_argument("-p", type=float, default=0.5)
+    parser.add_argument("-q", type=float, default=10.0)
+    parser.add_argument("--backend", default="numpy", choices=ACO.BACKENDS)
+    parser.add_argument("--nn", type=int, default=15)
+    parser.add_argument("--ls", choices=[ls for ls in ACO.LOCAL_SEARCH if ls])
+    parser.add_argument("--strategy", default="as", choices=STRATEGIES)
+    parser.add_argument("--time-limit", type=float, help="seconds per instance")
+    parser.add_argument("--patience", type=int, help="iterations without improvement per instance")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--jobs", type=int, default=1, help="instances solved in parallel processes")
+    parser.add_argument("--output", help="file for the JSON lines instead of stdout")
+    args = parser.parse_args()
+
+    config = {"ants": args.ants, "iter": args.iter, "a": args.a, "b": args.b, "p": args.p, "q": args.q,
+              "backend": args.backend, "nn": args.nn, "ls": args.ls, "strategy": args.strategy,
+              "time_limit": args.time_limit, "patience": args.patience, "seed": args.seed}
+    failed = 0
+    output = open(args.output, "w", encoding="utf-8") if args.output else nullcontext(sys.stdout)
+    with output as output, ProcessPoolExecutor(args.jobs) as pool:
+        futures = {pool.submit(solve_file, path, config): path for path in args.files}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += 1
+                result = {"file": futures[future], "error": f"{type(e).__name__}: {e}"}
+            print(json.dumps(result, ensure_ascii=False), file=output, flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
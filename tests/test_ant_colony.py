@@ -0,0 +1,37 @@
+import numpy as np
+from ant_colony import ACO, IslandACO
+
+
+def random_points(l: int, seed: int = 0) -> list[tuple[int, int]]:
+    return [tuple(p) for p in np.random.default_rng(seed).integers(0, 1000, (l, 2)).tolist()]
+
+
+def test_trails_outlive_parallel_run():
+    points = random_points(40)
+    aco = ACO(16, 5, 1.5, 1.2, 0.6, 10, seed=7, workers=2)
+    path = aco.run(points)
+    trails = aco.trails.dense()
+    assert trails.shape == (40, 40)
+    assert np.isfinite(trails).all()
+    assert len(path.indx) == 41
+
+
+def test_islands_with_parallel_colonies():
+    points = random_points(30, seed=1)
+    colonies = [ACO(8, 4, 1.0, 2.0, 0.5, 10, seed=s, workers=2) for s in (1, 2)]
+    path = IslandACO(colonies, interval=2, processes=False).run(points)
+    assert sorted(path.indx[:-1]) == list(range(30))
+
+
+def test_island_processes_with_parallel_colonies():
+    points = random_points(30, seed=2)
+    colonies = [ACO(8, 4, 1.0, 2.0, 0.5, 10, seed=s, workers=2) for s in (1, 2)]
+    path = IslandACO(colonies, interval=2, keep=0.5).run(points)
+    assert sorted(path.indx[:-1]) == list(range(30))
+
+
+def test_engines_agree_once_trails_vanish():
+    points = random_points(40, seed=3)
+    paths = [ACO(10, 10, 1.5, 1.2, 1.0, 10, backend=backend, nn=8, seed=4).run(points)
+             for backend in ACO.BACKENDS]
+    assert paths[0].indx == paths[1].indx
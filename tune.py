@@ -0,0 +1,143 @@
+import argparse
+import json
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+import numpy as np
+from ant_colony import ACO
+from solve import load_instance
+from utils.distance import DistanceMatrix
+from utils.race import FRace
+from utils.tsplib import Instance
+from utils.tuning import Tuning
+
+DEFAULTS = {"ants": 100, "iter": 20, "a": 1.5, "b": 1.2, "p": 0.6, "q": 10.0}
+RANGES = {"ants": (5, 200), "iter": (5, 100), "a": (0.5, 3.0), "b": (0.5, 3.0), "p": (0.1, 0.9), "q": (1.0, 100.0)}
+BUCKETS = (20, 50, 200)
+BUDGET = 1.0
+
+
+def sample_candidates(count: int, seed: int = None) -> list[dict]:
+    """
+    Returns the settings of `gui.py` followed by `count - 1` random settings within `RANGES`,
+    rounded to the resolution of the settings sliders, `q` is drawn on a log scale.
+    """
+
+    rng = np.random.default_rng(seed)
+    candidates = [dict(DEFAULTS)]
+    while len(candidates) < count:
+        config = {k: int(rng.integers(lo, hi + 1)) for k, (lo, hi) in RANGES.items() if k in ("ants", "iter")}
+        config.update({k: round(float(rng.uniform(*RANGES[k])), 1) for k in ("a", "b", "p")})
+        config["q"] = round(float(np.exp(rng.uniform(*np.log(RANGES["q"])))), 1)
+        config = {k: config[k] for k in Tuning.KEYS}
+        if config not in candidates:
+            candidates.append(config)
+    return candidates
+
+
+def random_instances(sizes: list[int], per_size: int, seed: int = None) -> list[Instance]:
+    """Generates `per_size` instances of uniformly random points on the 1000 x 1000 map of the GUI for every size."""
+
+    rng = np.random.default_rng(seed)
+    instances = []
+    for size in sizes:
+        for k in range(per_size):
+            points = [(int(x), int(y)) for x, y in rng.integers(0, 1001, size=(size, 2))]
+            instances.append(Instance(f"random{size}-{k}", points, DistanceMatrix.build(points)))
+    return instances
+
+
+def run_candidate(instance: Instance, config: dict, options: dict) -> float:
+    """Solves the instance with the candidate settings and returns the length of the best path."""
+
+    return ACO(**config, **options).run(instance.points, instance.name, dm=instance.dm).leng
+
+
+def race(candidates: list[dict], instances: list[Instance], pool: Executor, options: dict,
+         min_blocks: int = 5, alpha: float = 0.05, seed: int = None) -> tuple[list[int], np.ndarray]:
+    """
+    Races the candidates over the instances, one block per instance, evaluating the surviving candidates
+    of every block in parallel with the same seed. From `min_blocks` blocks on, candidates found worse
+    by `FRace.survivors` are dropped. With a `time_limit` in `options` every run gets the same time,
+    so more ants and iterations only win if they pay off within it; keep `workers` at most the number of cores
+    for the budget to hold. Returns the survivors ordered by mean rank, best first,
+    and the lengths of every block, NaN for the candidates dropped before it.
+    """
+
+    seeds = np.random.SeedSequence(seed).generate_state(len(instances))
+    alive = list(range(len(candidates)))
+    costs = []
+    for instance, block_seed in zip(instances, seeds):
+        block = dict(options, seed=int(block_seed))
+        futures = [pool.submit(run_candidate, instance, candidates[i], block) for i in alive]
+        row = np.full(len(candidates), np.nan)
+        row[alive] = [f.result() for f in futures]
+        costs.append(row)
+        if len(costs) >= min_blocks:
+            keep = FRace.survivors(np.array(costs)[:, alive], alpha)
+            alive = [i for i, kept in zip(alive, keep) if kept]
+        print(f"{instance.name:>16} n={len(instance.dm):<5} alive={len(alive)}", file=sys.stderr, flush=True)
+        if len(alive) == 1:
+            break
+    costs = np.array(costs)
+    ranks = FRace.ranks(costs[:, alive]).mean(axis=0)
+    return [alive[i] for i in np.argsort(ranks, kind="stable")], costs
+
+
+def tune(instances: list[Instance], buckets: list[int], candidates: list[dict], workers: int, options: dict,
+         min_blocks: int = 5, alpha: float = 0.05, seed: int = None) -> list[dict]:
+    """
+    Races the candidates separately over the instances of every size bucket, instances above the last bound
+    fall into the last bucket. Returns the best settings of every bucket that holds any instances.
+    """
+
+    bounds = sorted(buckets)
+    groups = {bound: [] for bound in bounds}
+    for instance in instances:
+        groups[next((b for b in bounds if len(instance.dm) <= b), bounds[-1])].append(instance)
+    results = []
+    with ProcessPoolExecutor(workers) as pool:
+        for bound, group in groups.items():
+            if not group:
+                continue
+            survivors, costs = race(candidates, group, pool, options, min_blocks, alpha, seed)
+            best = survivors[0]
+            results.append({"max_size": bound, "config": candidates[best], "blocks": len(costs),
+                            "survivors": len(survivors), "mean_leng": float(np.mean(costs[:, best]))})
+            print(f"bucket <= {bound}: {candidates[best]}", file=sys.stderr, flush=True)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Races ACO settings over training instances, F-race style, "
+                                                 "and writes the best settings per instance-size bucket.")
+    parser.add_argument("files", nargs="*", help="CSV (name,x,y) or TSPLIB training instances")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[], help="sizes of random training instances")
+    parser.add_argument("--per-size", type=int, default=10, help="random instances of every size")
+    parser.add_argument("--buckets", type=int, nargs="+", default=list(BUCKETS), help="upper bounds of the size buckets")
+    parser.add_argument("--candidates", type=int, default=32)
+    parser.add_argument("--min-blocks", type=int, default=5, help="instances raced before the first elimination")
+    parser.add_argument("--alpha", type=float, default=0.05, help="significance level of the tests")
+    parser.add_argument("--budget", type=float, default=BUDGET,
+                        help="seconds per run so candidates compete at equal CPU time, 0 races on length alone "
+                             "and favours the most ants and iterations")
+    parser.add_argument("--backend", default="numpy", choices=ACO.BACKENDS)
+    parser.add_argument("--nn", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="runs evaluated in parallel processes")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--out", default="tuned.json")
+    args = parser.parse_args()
+
+    instances = [load_instance(path) for path in args.files]
+    instances += random_instances(args.sizes, args.per_size, args.seed)
+    if not instances:
+        parser.error("no training instances, give files or --sizes")
+    candidates = sample_candidates(args.candidates, args.seed)
+    options = {"backend": args.backend, "nn": args.nn, "time_limit": args.budget or None}
+    buckets = tune(instances, args.buckets, candidates, args.workers, options, args.min_blocks, args.alpha, args.seed)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"buckets": buckets}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
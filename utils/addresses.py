@@ -0,0 +1,99 @@
+import csv
+import os
+from typing import Iterator
+import numpy as np
+
+
+class AddressCatalogue:
+    """
+    Catalogue of named addresses on the map, stored by columns: an n×2 int32 array of the coordinates and the names.
+    Read from CSV files with `name,x,y` rows by a streaming reader, or memory mapped from the binary `.npy`
+    file written by `save`, whose names are only decoded for the rows that are read.
+    """
+
+    def __init__(self, names, xy: np.ndarray) -> None:
+        """Takes a list of names, or an array of UTF-8 encoded names, and the coordinates of the same length."""
+
+        self._names = names
+        self.xy = np.asarray(xy, dtype=np.int32).reshape(-1, 2)
+        if len(self._names) != len(self.xy):
+            raise ValueError(f"{len(self._names)} names for {len(self.xy)} points")
+
+    @classmethod
+    def from_list(cls, addresses: list[tuple[str, int, int]]) -> "AddressCatalogue":
+        """Creates the catalogue from `(name, x, y)` tuples."""
+
+        return cls([name for name, _, _ in addresses], [(x, y) for _, x, y in addresses])
+
+    @staticmethod
+    def stream_csv(path: str, chunk: int = 65536, dtype=np.int32) -> Iterator[tuple[list[str], np.ndarray]]:
+        """
+        Reads a CSV file with `name,x,y` rows in blocks of `chunk` rows, an optional header row is skipped.
+        Coordinates are returned as `dtype`, rounded to the nearest integers for integer types.
+        """
+
+        def block(xy: list[tuple[float, float]]) -> np.ndarray:
+            xy = np.array(xy, dtype=float).reshape(-1, 2)
+            return (np.rint(xy) if np.issubdtype(dtype, np.integer) else xy).astype(dtype)
+
+        names, xy = [], []
+        with open(path, newline="", encoding="utf-8") as f:
+            for k, row in enumerate(csv.reader(f)):
+                if not row:
+                    continue
+                try:
+                    x, y = float(row[1]), float(row[2])
+                except (IndexError, ValueError):
+                    if k == 0:
+                        continue
+                    raise ValueError(f"Invalid CSV row {k + 1} in {path!r}: {row!r}")
+                names.append(row[0])
+                xy.append((x, y))
+                if len(names) == chunk:
+                    yield names, block(xy)
+                    names, xy = [], []
+        if names:
+            yield names, block(xy)
+
+    @classmethod
+    def load(cls, path: str) -> "AddressCatalogue":
+        """Reads the catalogue from a CSV file, or memory maps it from a `.npy` file written by `save`."""
+
+        if str(path).endswith(".npy"):
+            data = np.load(path, mmap_mode="r")
+            if data.dtype.names != ("name", "x", "y"):
+                raise ValueError(f"{path!r} is not an address catalogue: {data.dtype}")
+            return cls(data["name"], np.stack([data["x"], data["y"]], axis=1))
+        names, blocks = [], []
+        for block_names, block in AddressCatalogue.stream_csv(path):
+            names += block_names
+            blocks.append(block)
+        return cls(names, np.concatenate(blocks) if blocks else np.zeros((0, 2), dtype=np.int32))
+
+    def save(self, path: str) -> None:
+        """Writes the catalogue to a `.npy` file of fixed-width records that `load` memory maps."""
+
+        encoded = [self.name(i).encode("utf-8") for i in range(len(self))]
+        width = max((len(name) for name in encoded), default=1)
+        data = np.empty(len(self), dtype=[("name", f"S{max(width, 1)}"), ("x", "<i4"), ("y", "<i4")])
+        data["name"] = encoded
+        data["x"], data["y"] = self.xy[:, 0], self.xy[:, 1]
+        np.save(os.fspath(path), data)
+
+    def __len__(self) -> int:
+        return len(self.xy)
+
+    def name(self, i: int) -> str:
+        name = self._names[i]
+        return name.decode("utf-8") if isinstance(name, bytes) else name
+
+    def __getitem__(self, i: int) -> tuple[str, int, int]:
+        """Returns the address as a `(name, x, y)` tuple."""
+
+        x, y = self.xy[i]
+        return self.name(i), int(x), int(y)
+
+    def rows(self, start: int, stop: int) -> list[tuple[str, int, int]]:
+        """Returns the addresses from `start` to `stop` as `(name, x, y)` tuples."""
+
+        return [self[i] for i in range(max(start, 0), min(stop, len(self)))]
@@ -1,4 +1,5 @@
-from math import sqrt
+import numpy as np
+from utils.distance import DistanceMatrix
 
 
 class Base:
@@ -8,22 +9,51 @@ class Base:
     """
 
     @staticmethod
-    def __euclidean_dist(a: tuple[int], b: tuple[int]) -> float:
-        """Calculates the Euclidean distance between two 2D points."""
+    def _calculate_dist(dm: DistanceMatrix, indx: list[int]) -> float:
+        """Calculates the path length based on the index list of the distance matrix, summed in float64."""
 
-        return sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2)
+        return float(Base._calculate_dist_batch(dm, np.asarray([indx]))[0])
 
     @staticmethod
-    def _calculate_dist(dm: list[list[float]], indx: list[int]) -> float:
-        """Calculates the path length based on the index list of the distance matrix."""
+    def _calculate_dist_batch(dm: DistanceMatrix, tours: np.ndarray) -> np.ndarray:
+        """Calculates the path lengths of a batch of index rows of the distance matrix at once."""
 
-        dist = 0
-        for i in range(len(indx) - 1):
-            dist += dm[indx[i]][indx[i + 1]]
-        return dist
+        return dm[tours[:, :-1], tours[:, 1:]].sum(axis=1, dtype=float)
 
     @staticmethod
-    def _distance_matrix(points: list[tuple[int]]) -> list[list[float]]:
-        """Calculates the distance matrix for the given 2D points."""
+    def _distance_matrix(points: list[tuple[int]], storage: str = None) -> DistanceMatrix:
+        """
+        Calculates the distance matrix for the given 2D points.
+        The storage is picked by the number of points unless given explicitly.
+        """
 
-        return [[Base.__euclidean_dist(a, b) for b in points] for a in points]
+        return DistanceMatrix.build(points, storage)
+
+    @staticmethod
+    def _nearest_neighbour_path(dm: DistanceMatrix, start: int = 0) -> list[int]:
+        """Builds a path by always moving to the closest unvisited 2D point."""
+
+        l = len(dm)
+        visited = np.zeros(l, dtype=bool)
+        indx = [start]
+        visited[start] = True
+        for _ in range(l - 1):
+            i = int(np.argmin(np.where(visited, np.inf, dm.row(indx[-1]))))
+            visited[i] = True
+            indx.append(i)
+        indx.append(start)
+        return indx
+
+    @staticmethod
+    def _cheapest_insertion(dm: DistanceMatrix, indx: list[int], new: list[int]) -> list[int]:
+        """Inserts the new 2D points one by one into the closed path where they lengthen it the least."""
+
+        tour = list(indx[:-1])
+        for c in new:
+            if len(tour) < 2:
+                tour.append(c)
+                continue
+            u, v = np.asarray(tour), np.roll(tour, -1)
+            cost = dm[u, np.full(len(u), c)] + dm[np.full(len(v), c), v] - dm[u, v]
+            tour.insert(int(np.argmin(cost)) + 1, c)
+        return tour + tour[:1]
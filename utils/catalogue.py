@@ -0,0 +1,40 @@
+from collections import OrderedDict
+import numpy as np
+from utils.distance import DenseDistance, DistanceMatrix
+
+
+class DistanceCatalogue:
+    """
+    Distance and heuristic matrices of a whole catalogue of 2D points, calculated once.
+    The matrices of a selection of points are gathered from them and kept in an LRU cache
+    keyed by the selection and β.
+    An external distance matrix of the catalogue can be given instead of the Euclidean one.
+    The heuristic is calculated from the distances of every selection, so no n×n matrix is held
+    besides the distances themselves, whatever their storage.
+    """
+
+    def __init__(self, points: list[tuple[int, int]], cache: int = 32, dm: DistanceMatrix = None) -> None:
+        """Calculates the distance matrix of the catalogue, the matrices of the `cache` latest selections are kept."""
+
+        self.dm = dm if dm is not None else DistanceMatrix.build(points)
+        self._cache: OrderedDict[tuple[tuple[int, ...], float], tuple[DenseDistance, np.ndarray]] = OrderedDict()
+        self._cache_size = cache
+
+    def __len__(self) -> int:
+        return len(self.dm)
+
+    def matrices(self, indices: list[int], b: float) -> tuple[DenseDistance, np.ndarray]:
+        """Returns the distance matrix and the heuristic matrix η^β of the selected points, in the given order."""
+
+        key = (tuple(indices), float(b))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        idx = np.asarray(indices, dtype=np.int64)
+        dm = self.dm.select(idx)
+        res = dm, (1 / np.maximum(dm.dense(), 10**-5)) ** b
+        if self._cache_size > 0:
+            self._cache[key] = res
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return res
@@ -0,0 +1,253 @@
+from collections import OrderedDict
+from math import isqrt
+import os
+import numpy as np
+
+
+class DistanceMatrix:
+    """
+    Base class for the storages of the distance matrix between 2D points.
+    Supports the indexing used by the algorithms:
+    * `dm[i][j]` and `dm[i, j]` for a single distance;
+    * `dm[i]` for a whole row;
+    * `dm[rows, cols]` for a gather of many distances at once.\n
+    Directed matrices have `symmetric` unset, `dm[i, j]` is then the distance from i to j.
+    """
+
+    symmetric = True
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        return (self.row(i) for i in range(self._size))
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            return self.take(*key)
+        return _Row(self, key)
+
+    def row(self, i: int) -> np.ndarray:
+        """Returns the distances from the i-th point to all points."""
+
+        return self.take(np.full(self._size, i), np.arange(self._size))
+
+    def take(self, i, j):
+        """Returns the distances between the given pairs of points, scalars or arrays of indices."""
+
+        raise NotImplementedError
+
+    def dense(self) -> np.ndarray:
+        """Returns the full matrix as a 2D NumPy array."""
+
+        return np.stack([self.row(i) for i in range(self._size)]) if self._size else np.zeros((0, 0), np.float32)
+
+    def select(self, indices) -> "DenseDistance":
+        """Returns the dense matrix between the selected points, in the given order."""
+
+        idx = np.asarray(indices, dtype=np.int64)
+        return DenseDistance(np.ascontiguousarray(self.take(idx[:, None], idx[None, :])), self.symmetric)
+
+    @property
+    def nbytes(self) -> int:
+        """Returns the number of bytes held by the storage."""
+
+        raise NotImplementedError
+
+    @staticmethod
+    def build(points: list[tuple[int, int]], storage: str = None, budget: int = 256 * 2**20) -> "DistanceMatrix":
+        """
+        Creates the Euclidean distance matrix for the given 2D points.
+        Unless `storage` is given, picks the densest storage that fits into `budget` bytes:
+        `"dense"`, then `"condensed"`, then `"ondemand"`.
+        The budget bounds the stored distances only: a run of `ACO` on a dense matrix also keeps
+        the float64 n×n heuristic and choice-info matrices, about 4 times the distances on top.
+        """
+
+        xy = np.asarray(points, dtype=float).reshape(-1, 2)
+        l = len(xy)
+        if storage is None:
+            if l * l * 4 <= budget:
+                storage = "dense"
+            elif l * (l - 1) // 2 * 4 <= budget:
+                storage = "condensed"
+            else:
+                storage = "ondemand"
+        if storage == "dense":
+            return DenseDistance.from_points(xy)
+        if storage == "condensed":
+            return CondensedDistance.from_points(xy)
+        if storage == "ondemand":
+            return OnDemandDistance(xy)
+        raise ValueError(f"Unknown distance storage {storage!r}")
+
+    @staticmethod
+    def load(path: str, size: int = None, dtype=np.float32, symmetric: bool = False) -> "MappedDistance":
+        """
+        Memory maps an external n×n distance matrix, such as road distances, from a `.npy` file
+        or a raw binary file of `dtype` values in row-major order.
+        The size of a raw matrix is derived from the file size unless given.
+        The matrix is treated as directed unless `symmetric` is set.
+        """
+
+        if str(path).endswith(".npy"):
+            data = np.load(path, mmap_mode="r")
+        else:
+            if size is None:
+                size = isqrt(os.path.getsize(path) // np.dtype(dtype).itemsize)
+            data = np.memmap(path, dtype=dtype, mode="r", shape=(size, size))
+        if data.ndim != 2 or data.shape[0] != data.shape[1]:
+            raise ValueError(f"Distance matrix in {path!r} is not square: {data.shape}")
+        return MappedDistance(data, symmetric)
+
+
+class _Row:
+    """Lazy row of a distance matrix, single distances are read without materializing the row."""
+
+    __slots__ = ("_dm", "_i")
+
+    def __init__(self, dm: DistanceMatrix, i: int) -> None:
+        self._dm = dm
+        self._i = i
+
+    def __getitem__(self, j):
+        return self._dm.take(self._i, j)
+
+    def __len__(self) -> int:
+        return len(self._dm)
+
+    def __iter__(self):
+        return iter(self._dm.row(self._i))
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        return np.asarray(self._dm.row(self._i), dtype=dtype)
+
+
+class DenseDistance(DistanceMatrix):
+    """Full n×n matrix of float32 distances."""
+
+    BLOCK = 512
+
+    def __init__(self, data: np.ndarray, symmetric: bool = True) -> None:
+        super().__init__(len(data))
+        self._data = data
+        self.symmetric = symmetric
+
+    @classmethod
+    def from_points(cls, xy: np.ndarray) -> "DenseDistance":
+        """Calculates the matrix in blocks of `BLOCK` rows to avoid temporary n×n×2 arrays."""
+
+        l = len(xy)
+        data = np.empty((l, l), dtype=np.float32)
+        for start in range(0, l, cls.BLOCK):
+            block = xy[start:start + cls.BLOCK, None, :] - xy[None, :, :]
+            data[start:start + cls.BLOCK] = np.hypot(block[..., 0], block[..., 1])
+        return cls(data)
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def row(self, i: int) -> np.ndarray:
+        return self._data[i]
+
+    def take(self, i, j):
+        return self._data[i, j]
+
+    def dense(self) -> np.ndarray:
+        return self._data
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+
+class CondensedDistance(DistanceMatrix):
+    """Upper triangle of a symmetric matrix without the diagonal, n·(n-1)/2 float32 distances."""
+
+    def __init__(self, data: np.ndarray, size: int) -> None:
+        super().__init__(size)
+        self._data = data
+
+    @classmethod
+    def from_points(cls, xy: np.ndarray) -> "CondensedDistance":
+        """Calculates the condensed matrix row by row to avoid a temporary n×n array."""
+
+        l = len(xy)
+        data = np.empty(l * (l - 1) // 2, dtype=np.float32)
+        start = 0
+        for i in range(l - 1):
+            data[start:start + l - i - 1] = np.hypot(*(xy[i + 1:] - xy[i]).T)
+            start += l - i - 1
+        return cls(data, l)
+
+    def take(self, i, j):
+        i, j = np.asarray(i, dtype=np.int64), np.asarray(j, dtype=np.int64)
+        lo, hi = np.minimum(i, j), np.maximum(i, j)
+        k = lo * self._size - lo * (lo + 1) // 2 + hi - lo - 1
+        return np.where(lo == hi, np.float32(0), self._data[np.where(lo == hi, 0, k)])
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+
+class OnDemandDistance(DistanceMatrix):
+    """Distances calculated from the coordinates when requested, with an optional LRU cache of rows."""
+
+    def __init__(self, xy: np.ndarray, cache: int = 256) -> None:
+        super().__init__(len(xy))
+        self._xy = xy
+        self._cache: OrderedDict[int, np.ndarray] = OrderedDict()
+        self._cache_size = cache
+
+    def row(self, i: int) -> np.ndarray:
+        if i in self._cache:
+            self._cache.move_to_end(i)
+            return self._cache[i]
+        d = self._xy - self._xy[i]
+        row = np.hypot(d[:, 0], d[:, 1]).astype(np.float32)
+        if self._cache_size > 0:
+            self._cache[i] = row
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return row
+
+    def take(self, i, j):
+        d = self._xy[i] - self._xy[j]
+        return np.hypot(d[..., 0], d[..., 1]).astype(np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        return self._xy.nbytes + sum(row.nbytes for row in self._cache.values())
+
+
+class MappedDistance(DistanceMatrix):
+    """
+    Full n×n matrix memory mapped from a file, only the pages that are read are loaded.
+    Selections read the rows of the selected points in file order, so a small selection of a city-wide matrix stays cheap.
+    """
+
+    def __init__(self, data: np.ndarray, symmetric: bool = False) -> None:
+        super().__init__(len(data))
+        self._data = data
+        self.symmetric = symmetric
+
+    def row(self, i: int) -> np.ndarray:
+        return np.asarray(self._data[i])
+
+    def take(self, i, j):
+        return self._data[i, j]
+
+    def select(self, indices) -> DenseDistance:
+        idx = np.asarray(indices, dtype=np.int64)
+        data = np.empty((len(idx), len(idx)), dtype=self._data.dtype)
+        for r in np.argsort(idx):
+            data[r] = self._data[idx[r]][idx]
+        return DenseDistance(data, self.symmetric)
+
+    @property
+    def nbytes(self) -> int:
+        return 0
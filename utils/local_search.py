@@ -0,0 +1,139 @@
+from collections import deque
+import numpy as np
+from utils.distance import DistanceMatrix
+from utils.tour import or_opt_delta, two_opt_delta
+
+
+class LocalSearch:
+    """
+    Improves closed paths with 2-opt and Or-opt moves, whose deltas come from `utils.tour`.
+    Moves are only tried towards the nearest neighbours of a point, and a point whose neighbourhood
+    gave no improvement is skipped (don't-look bit) until one of its edges changes.
+    """
+
+    EPS = 10**-9
+
+    def __init__(self, dm: DistanceMatrix, neighbours: np.ndarray | list[list[int]], segment: int = 3) -> None:
+        """
+        Prepares the search for the given distance matrix and neighbour lists sorted by distance.
+        `segment` is the longest chain of points moved by Or-opt, 0 disables Or-opt.
+        """
+
+        self._take = dm.take
+        self._neighbours = neighbours.tolist() if isinstance(neighbours, np.ndarray) else neighbours
+        self._segment = segment
+
+    def __d(self, i: int, j: int) -> float:
+        return float(self._take(i, j))
+
+    def improve(self, indx: list[int]) -> list[int]:
+        """Returns the closed path improved until no move of the neighbourhood shortens it."""
+
+        tour = list(indx[:-1])
+        n = len(tour)
+        if n < 5:
+            return list(indx)
+        pos = [0] * n
+        for k, c in enumerate(tour):
+            pos[c] = k
+        queue = deque(tour)
+        active = [True] * n
+        while queue:
+            a = queue.popleft()
+            active[a] = False
+            touched = self.__two_opt(tour, pos, a) or self.__or_opt(tour, pos, a)
+            for c in touched or ():
+                if not active[c]:
+                    active[c] = True
+                    queue.append(c)
+        return tour + [tour[0]]
+
+    def __two_opt(self, tour: list[int], pos: list[int], a: int) -> tuple[int, ...] | None:
+        """Applies the first improving 2-opt move around the point `a`, returns the points of the changed edges."""
+
+        n = len(tour)
+        d = self.__d
+        for succ in (True, False):
+            a2 = tour[(pos[a] + 1) % n] if succ else tour[pos[a] - 1]
+            d_a = d(a, a2)
+            for c in self._neighbours[a]:
+                d_ac = d(a, c)
+                if d_ac >= d_a:
+                    break
+                c2 = tour[(pos[c] + 1) % n] if succ else tour[pos[c] - 1]
+                if c == a2 or c2 == a:
+                    continue
+                if two_opt_delta(d, a, a2, c, c2) < -self.EPS:
+                    if succ:
+                        LocalSearch.__reverse(tour, pos, a2, c)
+                    else:
+                        LocalSearch.__reverse(tour, pos, a, c2)
+                    return a, a2, c, c2
+        return None
+
+    def __or_opt(self, tour: list[int], pos: list[int], a: int) -> tuple[int, ...] | None:
+        """Applies the first improving move of a chain starting at the point `a`, returns the points of the changed edges."""
+
+        n = len(tour)
+        d = self.__d
+        for l in range(1, min(self._segment, n - 3) + 1):
+            i = pos[a]
+            s1, s2 = a, tour[(i + l - 1) % n]
+            p, nx = tour[i - 1], tour[(i + l) % n]
+            g = d(p, s1) + d(s2, nx) - d(p, nx)
+            if g <= self.EPS:
+                continue
+            seg = {tour[(i + k) % n] for k in range(l)}
+            for c in self._neighbours[s1]:
+                d_c = d(s1, c)
+                if d_c >= g:
+                    break
+                if c in seg:
+                    continue
+                c_next, c_prev = tour[(pos[c] + 1) % n], tour[pos[c] - 1]
+                if c != p and or_opt_delta(d, p, s1, s2, nx, c, c_next) < -self.EPS:
+                    LocalSearch.__move(tour, pos, i, l, c, False)
+                    return p, nx, s1, s2, c, c_next
+                if c != nx and or_opt_delta(d, p, s1, s2, nx, c_prev, c, True) < -self.EPS:
+                    LocalSearch.__move(tour, pos, i, l, c_prev, True)
+                    return p, nx, s1, s2, c_prev, c
+        return None
+
+    @staticmethod
+    def __reverse(tour: list[int], pos: list[int], u: int, v: int) -> None:
+        """Reverses the part of the tour from `u` to `v`, or the rest of it if that is shorter."""
+
+        n = len(tour)
+        i, j = pos[u], pos[v]
+        inner = (j - i) % n + 1
+        if inner * 2 > n:
+            i, j, inner = (j + 1) % n, (i - 1) % n, n - inner
+        for _ in range(inner // 2):
+            tour[i], tour[j] = tour[j], tour[i]
+            pos[tour[i]] = i
+            pos[tour[j]] = j
+            i = (i + 1) % n
+            j = (j - 1) % n
+
+    @staticmethod
+    def __move(tour: list[int], pos: list[int], i: int, l: int, u: int, reverse: bool) -> None:
+        """Moves the chain of `l` points starting at position `i` right after the point `u`."""
+
+        n = len(tour)
+        seg = [tour[(i + k) % n] for k in range(l)]
+        if reverse:
+            seg.reverse()
+        if i + l > n:
+            tour[:] = tour[i:] + tour[:i]
+            for k, c in enumerate(tour):
+                pos[c] = k
+            i = 0
+        j = pos[u]
+        if j > i:
+            tour[i:j + 1] = tour[i + l:j + 1] + seg
+            lo, hi = i, j + 1
+        else:
+            tour[j + 1:i + l] = seg + tour[j + 1:i]
+            lo, hi = j + 1, i + l
+        for k in range(lo, hi):
+            pos[tour[k]] = k
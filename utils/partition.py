@@ -0,0 +1,62 @@
+import numpy as np
+
+
+class Partition:
+    """
+    Splits large sets of 2D points into spatially compact clusters of about the same size:
+    * `"hilbert"` cuts the order of the points along a Hilbert curve into consecutive chunks;
+    * `"kmeans"` refines these chunks with a few Lloyd iterations, clusters may then differ in size.
+    """
+
+    METHODS = ("hilbert", "kmeans")
+
+    @staticmethod
+    def hilbert_order(xy: np.ndarray, bits: int = 16) -> np.ndarray:
+        """Returns the indices of the points sorted by their position along a Hilbert curve over their bounding box."""
+
+        xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        if not len(xy):
+            return np.zeros(0, dtype=np.intp)
+        side = 2**bits
+        lo = xy.min(axis=0)
+        span = max(float((xy.max(axis=0) - lo).max()), 10**-9)
+        grid = ((xy - lo) / span * (side - 1)).astype(np.int64)
+        x, y = grid[:, 0], grid[:, 1]
+        keys = np.zeros(len(xy), dtype=np.int64)
+        s = side // 2
+        while s > 0:
+            rx = (x & s) > 0
+            ry = (y & s) > 0
+            keys += s * s * ((3 * rx.astype(np.int64)) ^ ry.astype(np.int64))
+            flip = rx & ~ry
+            x = np.where(flip, side - 1 - x, x)
+            y = np.where(flip, side - 1 - y, y)
+            x, y = np.where(ry, x, y), np.where(ry, y, x)
+            s //= 2
+        return np.argsort(keys, kind="stable")
+
+    @staticmethod
+    def split(xy: np.ndarray, size: int, method: str = "hilbert", rounds: int = 10) -> list[np.ndarray]:
+        """Returns the indices of the points of every cluster, clusters hold about `size` points."""
+
+        if method not in Partition.METHODS:
+            raise ValueError(f"Unknown partition method {method!r}, expected one of {Partition.METHODS}")
+        xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        k = max(1, -(-len(xy) // max(size, 1)))
+        clusters = [c for c in np.array_split(Partition.hilbert_order(xy), k) if len(c)]
+        if method == "hilbert" or len(clusters) < 2:
+            return clusters
+        centers = np.array([xy[c].mean(axis=0) for c in clusters])
+        for _ in range(rounds):
+            labels = np.empty(len(xy), dtype=np.intp)
+            for start in range(0, len(xy), 4096):
+                d = xy[start:start + 4096, None, :] - centers[None, :, :]
+                labels[start:start + 4096] = np.argmin(d[..., 0] ** 2 + d[..., 1] ** 2, axis=1)
+            counts = np.bincount(labels, minlength=len(centers))
+            moved = np.stack([np.bincount(labels, xy[:, 0], len(centers)), np.bincount(labels, xy[:, 1], len(centers))], axis=1)
+            keep = counts > 0
+            updated = moved[keep] / counts[keep, None]
+            if len(updated) == len(centers) and np.allclose(updated, centers):
+                break
+            centers = updated
+        return [np.flatnonzero(labels == i) for i in np.unique(labels)]
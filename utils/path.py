@@ -1,15 +1,48 @@
 from dataclasses import dataclass
+import numpy as np
+from utils.distance import DistanceMatrix
+from utils.tour import Tour
 
 
-@dataclass
+@dataclass(eq=False)
 class Path:
     """
     Dataclass describing a path using:
-    * list of point indices;
+    * int32 array of the point indices in visiting order, without repeating the start;
     * path length;
-    * path name (optional).
+    * path name (optional);
+    * iteration of the algorithm and seconds elapsed when the path was found (optional).\n
+    The closed list form of `indx`, the start repeated at the end, is produced on demand for plotting and export.
     """
 
-    indx: list[int]
+    order: np.ndarray
     leng: float
     name: str
+    iteration: int = None
+    elapsed: float = None
+
+    def __post_init__(self) -> None:
+        self.order = np.array(self.order, dtype=np.int32).reshape(-1)
+
+    @classmethod
+    def from_indx(cls, indx: list[int], leng: float, name: str, iteration: int = None, elapsed: float = None) -> "Path":
+        """Creates the path from the closed list form, the start repeated at the end."""
+
+        return cls(order=indx[:-1], leng=leng, name=name, iteration=iteration, elapsed=elapsed)
+
+    @classmethod
+    def from_tour(cls, tour: Tour, name: str, iteration: int = None, elapsed: float = None) -> "Path":
+        """Creates the path from a compact tour."""
+
+        return cls(order=tour.order, leng=tour.leng, name=name, iteration=iteration, elapsed=elapsed)
+
+    @property
+    def indx(self) -> list[int]:
+        """Returns the closed list form of the path, the start repeated at the end."""
+
+        return self.order.tolist() + self.order[:1].tolist()
+
+    def tour(self, dm: DistanceMatrix) -> Tour:
+        """Returns the path as a compact tour over the distance matrix `dm`."""
+
+        return Tour(self.order, dm)
@@ -0,0 +1,172 @@
+import numpy as np
+
+
+class PheromoneMatrix:
+    """
+    Pheromone trails between 2D points with lazy evaporation.
+    Evaporation only multiplies a global scale factor, the stored values are the trails divided by it
+    and are folded back into real values when the factor nears underflow.
+    Symmetric problems keep a single triangular copy of the trails, including the diagonal.
+    `writes` counts the stored values written so far.
+    """
+
+    FOLD_SCALE = 10**-30
+    BLOCK = 256
+
+    def __init__(self, size: int, tau0: float = 1.0, symmetric: bool = True) -> None:
+        """Creates the trails of `size` points, all set to `tau0`."""
+
+        self._size = size
+        self.symmetric = symmetric
+        self.data = np.full(size * (size + 1) // 2 if symmetric else size * size, float(tau0))
+        self.scale = 1.0
+        self.writes = 0
+        self._touched: list[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            return self.take(*key)
+        return self.take(key, np.arange(self._size))
+
+    def _key(self, i, j) -> np.ndarray:
+        """Returns the position of the trail (i, j) in the stored values."""
+
+        i, j = np.asarray(i, dtype=np.int64), np.asarray(j, dtype=np.int64)
+        if not self.symmetric:
+            return i * self._size + j
+        lo, hi = np.minimum(i, j), np.maximum(i, j)
+        return lo * self._size - lo * (lo - 1) // 2 + hi - lo
+
+    def _pair(self, key: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the points (i, j) of the given stored positions, the inverse of `_key`."""
+
+        if not self.symmetric:
+            return np.divmod(key, self._size)
+        starts = np.arange(self._size, dtype=np.int64)
+        starts = starts * self._size - starts * (starts - 1) // 2
+        lo = np.searchsorted(starts, key, side="right") - 1
+        return lo, key - starts[lo] + lo
+
+    def take(self, i, j):
+        """Returns the real trails between the given pairs of points."""
+
+        return self.data[self._key(i, j)] * self.scale
+
+    def raw(self, i, j):
+        """
+        Returns the stored trails between the given pairs of points.
+        They differ from the real ones by the same factor, which cancels out in the choice probabilities.
+        """
+
+        return self.data[self._key(i, j)]
+
+    def dense(self, raw: bool = False) -> np.ndarray:
+        """Returns the full n×n matrix of trails, real or stored, filled row by row from the stored values."""
+
+        n = self._size
+        if not self.symmetric:
+            out = self.data.reshape(n, n).copy()
+        else:
+            out = np.empty((n, n), dtype=self.data.dtype)
+            start = 0
+            for lo in range(n):
+                out[lo, lo:] = self.data[start:start + n - lo]
+                start += n - lo
+            for lo in range(0, n, self.BLOCK):
+                hi = min(lo + self.BLOCK, n)
+                out[lo:hi, :lo] = out[:lo, lo:hi].T
+                i, j = np.tril_indices(hi - lo, -1)
+                out[lo + i, lo + j] = out[lo + j, lo + i]
+        if not raw:
+            out *= self.scale
+        return out
+
+    def evaporate(self, p: float) -> bool:
+        """Evaporates all trails in O(1), returns True if the stored values had to be rescaled."""
+
+        self.scale *= 1 - p
+        if self.scale >= self.FOLD_SCALE:
+            return False
+        self.fold()
+        return True
+
+    def fold(self) -> None:
+        """Folds the scale factor back into the stored values."""
+
+        self.data *= self.scale
+        self.scale = 1.0
+        self.writes += self.data.size
+
+    def load(self, trails: np.ndarray) -> None:
+        """Sets the trails from a full n×n matrix, for symmetric problems from its upper triangle."""
+
+        n = self._size
+        if not self.symmetric:
+            self.data[:] = np.asarray(trails).reshape(-1)
+        else:
+            start = 0
+            for lo in range(n):
+                self.data[start:start + n - lo] = trails[lo, lo:]
+                start += n - lo
+        self.scale = 1.0
+        self.writes += self.data.size
+
+    def reset(self, tau: float) -> None:
+        """Sets all trails to `tau`."""
+
+        self.data.fill(tau)
+        self.scale = 1.0
+        self.writes += self.data.size
+
+    def clip(self, lo: float, hi: float) -> None:
+        """Keeps all trails within the given bounds, folding the scale factor first."""
+
+        self.fold()
+        np.clip(self.data, lo, hi, out=self.data)
+        self.writes += self.data.size
+
+    def blend(self, i, j, keep: float, add: float) -> None:
+        """Replaces the trails between the given pairs of points with `keep`·τ + `add`."""
+
+        key = np.asarray(self._key(i, j)).ravel()
+        self.data[key] = self.data[key] * keep + add / self.scale
+        self.writes += key.size
+        self._touched.append(key)
+
+    def deposit(self, indx, amount) -> None:
+        """
+        Deposits pheromone on the edges of one path, or of a batch of paths given as rows,
+        with one amount per path.
+        """
+
+        indx = np.asarray(indx)
+        if indx.ndim == 1:
+            indx = indx[None, :]
+        key = self._key(indx[:, :-1], indx[:, 1:])
+        np.add.at(self.data, key.ravel(), np.repeat(np.asarray(amount, dtype=float) / self.scale, key.shape[1]))
+        self.writes += key.size
+        self._touched.append(key.ravel())
+
+    def entropy(self) -> float:
+        """
+        Returns the mean entropy of the trails leaving every point, normalized to [0, 1].
+        Uniform trails give 1, a colony converged to a single path gives values near 0.
+        """
+
+        if self._size < 3:
+            return 0.0
+        t = self.dense(raw=True)
+        np.fill_diagonal(t, 0.0)
+        p = t / np.maximum(t.sum(axis=1, keepdims=True), np.finfo(float).tiny)
+        h = -np.sum(p * np.log(np.where(p > 0, p, 1.0)), axis=1)
+        return float(h.mean() / np.log(self._size - 1))
+
+    def touched(self) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the unique edges changed by deposits since the previous call."""
+
+        key = np.unique(np.concatenate(self._touched)) if self._touched else np.empty(0, dtype=np.int64)
+        self._touched = []
+        return self._pair(key)
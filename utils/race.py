@@ -0,0 +1,95 @@
+import math
+from statistics import NormalDist
+import numpy as np
+
+
+class FRace:
+    """
+    Statistics of F-race: candidates are evaluated block by block, a block being one training instance,
+    and after every block the Friedman test over the ranks of their costs decides whether they differ.
+    If they do, the candidates worse than the best one by the Conover post-hoc test are dropped.
+    """
+
+    @staticmethod
+    def ranks(costs: np.ndarray) -> np.ndarray:
+        """Ranks the candidates (columns) within every block (row) from 1, ties share their average rank."""
+
+        costs = np.asarray(costs, dtype=float)
+        ranks = np.empty_like(costs)
+        for row, cost in zip(ranks, costs):
+            order = np.argsort(cost, kind="stable")
+            row[order] = np.arange(1, len(cost) + 1)
+            for value in np.unique(cost):
+                tied = cost == value
+                if tied.sum() > 1:
+                    row[tied] = row[tied].mean()
+        return ranks
+
+    @staticmethod
+    def friedman(ranks: np.ndarray) -> tuple[float, float]:
+        """Returns the Friedman statistic of the ranks, corrected for ties, and its p-value."""
+
+        n, k = ranks.shape
+        a = float((ranks**2).sum())
+        c = n * k * (k + 1) ** 2 / 4
+        if k < 2 or a <= c:
+            return 0.0, 1.0
+        t = (k - 1) * float(((ranks.sum(axis=0) - n * (k + 1) / 2) ** 2).sum()) / (a - c)
+        return t, _chi2_sf(t, k - 1)
+
+    @staticmethod
+    def survivors(costs: np.ndarray, alpha: float = 0.05) -> np.ndarray:
+        """
+        Returns the mask of the candidates kept after the blocks of `costs` seen so far:
+        all of them unless the Friedman test rejects equality at level `alpha`,
+        otherwise those not worse than the best rank sum by the Conover test.
+        """
+
+        costs = np.asarray(costs, dtype=float)
+        n, k = costs.shape
+        keep = np.ones(k, dtype=bool)
+        if n < 2 or k < 2:
+            return keep
+        ranks = FRace.ranks(costs)
+        t, p_value = FRace.friedman(ranks)
+        if p_value >= alpha:
+            return keep
+        sums = ranks.sum(axis=0)
+        a = float((ranks**2).sum())
+        c = n * k * (k + 1) ** 2 / 4
+        df = (n - 1) * (k - 1)
+        spread = math.sqrt(max(2 * n * (1 - t / (n * (k - 1))) * (a - c) / df, 0.0))
+        return sums - sums.min() <= _t_quantile(1 - alpha / 2, df) * spread
+
+
+def _chi2_sf(x: float, df: int) -> float:
+    """Survival function of the chi-squared distribution with an integer number of degrees of freedom."""
+
+    if x <= 0:
+        return 1.0
+    if df % 2 == 0:
+        term = total = math.exp(-x / 2)
+        for i in range(1, df // 2):
+            term *= x / (2 * i)
+            total += term
+        return min(total, 1.0)
+    total = math.erfc(math.sqrt(x / 2))
+    term = math.sqrt(2 * x / math.pi) * math.exp(-x / 2)
+    for i in range(1, (df + 1) // 2):
+        total += term
+        term *= x / (2 * i + 1)
+    return min(total, 1.0)
+
+
+def _t_quantile(p: float, df: int) -> float:
+    """
+    Quantile of Student's t distribution by the Cornish-Fisher expansion around the normal quantile,
+    within 1% from 4 degrees of freedom, the fewest a race with `min_blocks` of 5 can have.
+    """
+
+    z = NormalDist().inv_cdf(p)
+    g1 = (z**3 + z) / 4
+    g2 = (5 * z**5 + 16 * z**3 + 3 * z) / 96
+    g3 = (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / 384
+    g4 = (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z) / 92160
+    return z + g1 / df + g2 / df**2 + g3 / df**3 + g4 / df**4
@@ -0,0 +1,50 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+
+class SharedArray:
+    """
+    NumPy array placed in a named shared memory block.
+    Other processes attach to it by name instead of receiving a pickled copy of the data.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, shape: tuple[int, ...], dtype: str, owner: bool) -> None:
+        """Wraps an existing shared memory block, use `create` or `attach` instead."""
+
+        self._shm = shm
+        self._owner = owner
+        self.array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, source: np.ndarray) -> "SharedArray":
+        """Creates a new shared memory block holding a copy of the given array."""
+
+        shm = shared_memory.SharedMemory(create=True, size=max(source.nbytes, 1))
+        shared = cls(shm, source.shape, source.dtype.str, owner=True)
+        shared.array[...] = source
+        return shared
+
+    @classmethod
+    def attach(cls, spec: tuple[str, tuple[int, ...], str]) -> "SharedArray":
+        """Attaches to a shared memory block created by another process."""
+
+        name, shape, dtype = spec
+        return cls(shared_memory.SharedMemory(name=name), shape, dtype, owner=False)
+
+    @property
+    def spec(self) -> tuple[str, tuple[int, ...], str]:
+        """Returns the picklable description needed to attach to the array."""
+
+        return self._shm.name, self.array.shape, self.array.dtype.str
+
+    def close(self) -> None:
+        """Detaches from the shared memory block and frees it if this process created it."""
+
+        self.array = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # views of the array are still alive, the mapping is released together with them
+            pass
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+from utils.distance import DistanceMatrix
+from utils.path import Path
+
+
+class SolutionCache:
+    """
+    Cache of solved paths keyed by the set of 2D points, the distance source and the parameters of the algorithm.
+    The key does not depend on the order of the points: paths are stored over the points sorted by coordinates
+    and mapped back to the order of every lookup.
+    The latest `size` solutions are kept in memory in front of an optional SQLite file.
+    """
+
+    def __init__(self, path: str = None, size: int = 128) -> None:
+        """Opens the cache, solutions are only kept in memory without a file `path`."""
+
+        self._memory: OrderedDict[tuple[str, str], tuple[float, list[int]]] = OrderedDict()
+        self._size = size
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS solutions (points TEXT, params TEXT, leng REAL, indx TEXT, "
+                             "PRIMARY KEY (points, params))")
+            self._db.commit()
+
+    @staticmethod
+    def params(ants: int, iter: int, a: float, b: float, p: float, q: float) -> str:
+        """Returns the key of the algorithm parameters."""
+
+        return json.dumps([int(ants), int(iter), float(a), float(b), float(p), float(q)])
+
+    @staticmethod
+    def _canonical(points: list[tuple[int, int]], dm: DistanceMatrix = None) -> tuple[str, np.ndarray]:
+        """
+        Returns the key of the point set and the order that sorts the points by coordinates.
+        Euclidean distances are assumed without `dm`, otherwise its distances in sorted order are part of the key.
+        """
+
+        xy = np.asarray(points, dtype=float).reshape(-1, 2)
+        order = np.lexsort((xy[:, 1], xy[:, 0]))
+        digest = hashlib.sha256(np.ascontiguousarray(xy[order]).tobytes())
+        if dm is None:
+            digest.update(b"euclidean")
+        else:
+            digest.update(b"matrix")
+            digest.update(np.ascontiguousarray(dm.take(order[:, None], order[None, :]), dtype=np.float64).tobytes())
+        return digest.hexdigest(), order
+
+    def get(self, points: list[tuple[int, int]], params: str, dm: DistanceMatrix = None, name: str = None) -> Path | None:
+        """Returns the cached path for the points and parameters, or None."""
+
+        key, order = SolutionCache._canonical(points, dm)
+        found = self.__lookup(key, params)
+        if found is None:
+            return None
+        leng, indx = found
+        return Path.from_indx(order[indx], leng=leng, name=name)
+
+    def warm(self, points: list[tuple[int, int]], dm: DistanceMatrix = None) -> list[int] | None:
+        """Returns the shortest cached path for the points under any parameters, to warm start a new solve."""
+
+        key, order = SolutionCache._canonical(points, dm)
+        with self._lock:
+            found = [v for (k, _), v in self._memory.items() if k == key]
+            if self._db is not None:
+                row = self._db.execute("SELECT leng, indx FROM solutions WHERE points = ? ORDER BY leng LIMIT 1",
+                                       (key,)).fetchone()
+                if row is not None:
+                    found.append((row[0], json.loads(row[1])))
+        if not found:
+            return None
+        return order[min(found, key=lambda v: v[0])[1]].tolist()
+
+    def put(self, points: list[tuple[int, int]], params: str, path: Path, dm: DistanceMatrix = None) -> None:
+        """Stores the path unless a shorter one is cached for the same points and parameters."""
+
+        key, order = SolutionCache._canonical(points, dm)
+        found = self.__lookup(key, params)
+        if found is not None and found[0] <= path.leng:
+            return
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        value = (float(path.leng), rank[path.indx].tolist())
+        with self._lock:
+            self.__remember((key, params), value)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?)",
+                                 (key, params, value[0], json.dumps(value[1])))
+                self._db.commit()
+
+    def close(self) -> None:
+        """Closes the SQLite file."""
+
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __lookup(self, key: str, params: str) -> tuple[float, list[int]] | None:
+        """Finds a solution in memory, then in the file, in canonical order."""
+
+        with self._lock:
+            if (key, params) in self._memory:
+                self._memory.move_to_end((key, params))
+                return self._memory[(key, params)]
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT leng, indx FROM solutions WHERE points = ? AND params = ?",
+                                   (key, params)).fetchone()
+            if row is None:
+                return None
+            value = (row[0], json.loads(row[1]))
+            self.__remember((key, params), value)
+            return value
+
+    def __remember(self, key: tuple[str, str], value: tuple[float, list[int]]) -> None:
+        """Puts a solution into the in-memory LRU layer."""
+
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._size:
+            self._memory.popitem(last=False)
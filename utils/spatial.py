@@ -0,0 +1,100 @@
+from math import sqrt
+import numpy as np
+
+
+class GridIndex:
+    """
+    Spatial index over 2D points based on a uniform grid of buckets.
+    Answers nearest neighbour, rectangle and radius queries without scanning every point.
+    """
+
+    def __init__(self, points: list[tuple[int, int]], per_cell: int = 2) -> None:
+        """Distributes the points over grid cells holding about `per_cell` points each."""
+
+        self._xy = np.asarray(points, dtype=float).reshape(-1, 2)
+        l = len(self._xy)
+        self._lo = self._xy.min(axis=0) if l else np.zeros(2)
+        span = np.maximum((self._xy.max(axis=0) if l else np.ones(2)) - self._lo, 10**-9)
+        self._cell = max(sqrt(span.prod() * per_cell / max(l, 1)), span.max() / sqrt(max(l, 1)))
+        keys = self.__cell_of(self._xy)
+        order = np.lexsort((keys[:, 1], keys[:, 0]))
+        bounds = np.flatnonzero(np.any(np.diff(keys[order], axis=0), axis=1)) + 1
+        self._cells = {tuple(keys[group[0]]): group for group in np.split(order, bounds) if len(group)}
+        self._size = keys.max(axis=0) + 1 if l else np.ones(2, dtype=int)
+
+    def __len__(self) -> int:
+        return len(self._xy)
+
+    def __cell_of(self, xy: np.ndarray) -> np.ndarray:
+        """Returns the grid cell coordinates of the given points."""
+
+        return np.floor((xy - self._lo) / self._cell).astype(np.int64)
+
+    def __ring(self, cx: int, cy: int, r: int) -> list[np.ndarray]:
+        """Returns the buckets of the cells at Chebyshev distance `r` from the cell (cx, cy)."""
+
+        if r == 0:
+            return [self._cells[(cx, cy)]] if (cx, cy) in self._cells else []
+        cells = [(x, cy - r) for x in range(cx - r, cx + r + 1)] + [(x, cy + r) for x in range(cx - r, cx + r + 1)]
+        cells += [(cx - r, y) for y in range(cy - r + 1, cy + r)] + [(cx + r, y) for y in range(cy - r + 1, cy + r)]
+        return [self._cells[c] for c in cells if c in self._cells]
+
+    def nearest(self, point: tuple[float, float], k: int, exclude: int = None) -> np.ndarray:
+        """Returns the indices of the `k` points closest to the given one, nearest first."""
+
+        k = min(k, len(self) - (exclude is not None))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        xy = np.asarray(point, dtype=float)
+        cx, cy = self.__cell_of(xy[None, :])[0]
+        max_r = int(max(abs(cx), abs(cy), *abs(self._size - (cx, cy)))) + 1
+        found = []
+        count = 0
+        for r in range(max_r + 1):
+            for bucket in self.__ring(cx, cy, r):
+                found.append(bucket)
+                count += len(bucket)
+            if count - (exclude is not None) < k:
+                continue
+            indx = np.concatenate(found)
+            if exclude is not None:
+                indx = indx[indx != exclude]
+            dist = np.hypot(*(self._xy[indx] - xy).T)
+            part = np.argpartition(dist, k - 1)[:k]
+            if dist[part].max() <= r * self._cell or r == max_r:
+                return indx[part[np.argsort(dist[part], kind="stable")]]
+        return np.empty(0, dtype=np.int64)
+
+    def candidate_lists(self, k: int) -> np.ndarray:
+        """Returns the `k` nearest neighbours of every indexed point, one row per point."""
+
+        k = min(k, len(self) - 1)
+        return np.array([self.nearest(p, k, exclude=i) for i, p in enumerate(self._xy)], dtype=np.intp).reshape(len(self), k)
+
+    def within_rect(self, lo: tuple[float, float], hi: tuple[float, float]) -> np.ndarray:
+        """Returns the indices of the points inside the rectangle with the corners `lo` and `hi`, in index order."""
+
+        lo, hi = np.minimum(lo, hi).astype(float), np.maximum(lo, hi).astype(float)
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+        first = np.maximum(self.__cell_of(lo[None, :])[0], 0)
+        last = np.minimum(self.__cell_of(hi[None, :])[0], self._size - 1)
+        if np.any(last < first):
+            return np.empty(0, dtype=np.int64)
+        if np.prod(last - first + 1) > len(self._cells):
+            indx = np.arange(len(self))
+        else:
+            buckets = [self._cells[(x, y)] for x in range(first[0], last[0] + 1)
+                       for y in range(first[1], last[1] + 1) if (x, y) in self._cells]
+            if not buckets:
+                return np.empty(0, dtype=np.int64)
+            indx = np.concatenate(buckets)
+        xy = self._xy[indx]
+        return np.sort(indx[np.all((xy >= lo) & (xy <= hi), axis=1)])
+
+    def within_radius(self, point: tuple[float, float], r: float) -> np.ndarray:
+        """Returns the indices of the points within the distance `r` from the given one, in index order."""
+
+        xy = np.asarray(point, dtype=float)
+        indx = self.within_rect(xy - r, xy + r)
+        return indx[np.hypot(*(self._xy[indx] - xy).T) <= r]
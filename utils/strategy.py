@@ -0,0 +1,157 @@
+from math import inf
+import numpy as np
+from utils.base import Base
+from utils.distance import DistanceMatrix
+from utils.pheromone import PheromoneMatrix
+
+
+class AntSystem:
+    """
+    Classic Ant System, the default pheromone update strategy of `ACO`.
+    All trails start at 1 and evaporate by ρ every iteration, then every ant deposits Q / length.\n
+    A strategy is driven by `ACO` through the following calls:
+    * `start` once per run, returns the initial trail τ0;
+    * `begin` at the start of every iteration;
+    * `offer` with every built path, or a batch of paths given as rows;
+    * `end` at the end of every iteration;
+    * `local_update` after every construction step if `LOCAL` is set.\n
+    `begin` and `end` return True when every trail changed and the choice-info matrix has to be rebuilt.
+    """
+
+    LOCAL = False
+    q0 = 0.0
+
+    def start(self, p: float, q: float, dm: DistanceMatrix) -> float:
+        """Prepares the strategy for a new run."""
+
+        self.p = p
+        self.q = q
+        return 1.0
+
+    def begin(self, pm: PheromoneMatrix) -> bool:
+        return pm.evaporate(self.p)
+
+    def offer(self, pm: PheromoneMatrix, indx, leng) -> None:
+        pm.deposit(indx, self.q / np.asarray(leng, dtype=float))
+
+    def end(self, pm: PheromoneMatrix) -> bool:
+        return False
+
+    def local_update(self, pm: PheromoneMatrix, i, j) -> None:
+        pass
+
+    @staticmethod
+    def _nearest_neighbour_leng(dm: DistanceMatrix) -> float:
+        """Returns the length of the nearest neighbour path, the usual scale of the initial trails."""
+
+        return float(Base._calculate_dist_batch(dm, np.array([Base._nearest_neighbour_path(dm)]))[0])
+
+    @staticmethod
+    def _shortest(indx, leng) -> tuple[list[int], float]:
+        """Returns the shortest of the offered paths."""
+
+        leng = np.atleast_1d(np.asarray(leng, dtype=float))
+        best = int(np.argmin(leng))
+        indx = np.asarray(indx)
+        return (indx[best] if indx.ndim == 2 else indx).tolist(), float(leng[best])
+
+
+class MaxMinAntSystem(AntSystem):
+    """
+    MAX-MIN Ant System.
+    Only the iteration-best path deposits, or the best-so-far path every `gb_every` iterations,
+    and all trails are kept within [τmin, τmax]. τmax = Q / (ρ·L) follows the best length L,
+    starting from the nearest neighbour path, and τmin is derived from `p_best`, the probability
+    of building the best path once the colony converged. After `restart` iterations without
+    improvement all trails are reset to τmax.
+    The trails evaporate by their own rate `rho` rather than the ρ of the colony: with the bounds,
+    rates suited to Ant System lock the colony onto one of its first paths. None takes the ρ of the colony.
+    """
+
+    def __init__(self, p_best: float = 0.05, gb_every: int = 5, restart: int = 50, rho: float | None = 0.02) -> None:
+        if rho is not None and not 0 < rho < 1:
+            raise ValueError(f"The evaporation rate must be within (0, 1), got {rho}")
+        self.p_best = p_best
+        self.gb_every = gb_every
+        self.restart = restart
+        self.rho = rho
+
+    def start(self, p: float, q: float, dm: DistanceMatrix) -> float:
+        super().start(p if self.rho is None else self.rho, q, dm)
+        self._size = len(dm)
+        self._iteration = 0
+        self._stale = 0
+        self._best = ([], inf)
+        self._iter_best = ([], inf)
+        self.__bounds(AntSystem._nearest_neighbour_leng(dm))
+        return self._tmax
+
+    def __bounds(self, leng: float) -> None:
+        """Updates the trail bounds for the given best length."""
+
+        self._tmax = self.q / (self.p * leng) if self.p > 0 else self.q / leng
+        root = self.p_best ** (1 / max(self._size, 1))
+        avg = max(self._size / 2 - 1, 1)
+        self._tmin = min(self._tmax * (1 - root) / (avg * root), self._tmax)
+
+    def offer(self, pm: PheromoneMatrix, indx, leng) -> None:
+        best = AntSystem._shortest(indx, leng)
+        if best[1] < self._iter_best[1]:
+            self._iter_best = best
+
+    def end(self, pm: PheromoneMatrix) -> bool:
+        self._iteration += 1
+        if self._iter_best[1] < self._best[1]:
+            self._best = self._iter_best
+            self.__bounds(self._best[1])
+            self._stale = 0
+        else:
+            self._stale += 1
+        indx, leng = self._best if self._iteration % self.gb_every == 0 else self._iter_best
+        self._iter_best = ([], inf)
+        pm.deposit(indx, self.q / leng)
+        if self._stale >= self.restart:
+            self._stale = 0
+            pm.reset(self._tmax)
+        else:
+            pm.clip(self._tmin, self._tmax)
+        return True
+
+
+class AntColonySystem(AntSystem):
+    """
+    Ant Colony System.
+    Ants move to the most attractive point with probability `q0` and choose by roulette otherwise.
+    Every step lowers the trail of the used edge towards τ0 = Q / (n·L) with the rate `xi`,
+    where L is the nearest neighbour path length, and only the best-so-far path
+    evaporates and deposits at the end of an iteration.
+    """
+
+    LOCAL = True
+
+    def __init__(self, q0: float = 0.9, xi: float = 0.1) -> None:
+        self.q0 = q0
+        self.xi = xi
+
+    def start(self, p: float, q: float, dm: DistanceMatrix) -> float:
+        super().start(p, q, dm)
+        self._best = ([], inf)
+        self._tau0 = q / (max(len(dm), 1) * AntSystem._nearest_neighbour_leng(dm))
+        return self._tau0
+
+    def begin(self, pm: PheromoneMatrix) -> bool:
+        return False
+
+    def offer(self, pm: PheromoneMatrix, indx, leng) -> None:
+        best = AntSystem._shortest(indx, leng)
+        if best[1] < self._best[1]:
+            self._best = best
+
+    def end(self, pm: PheromoneMatrix) -> bool:
+        indx, leng = self._best
+        if indx:
+            pm.blend(indx[:-1], indx[1:], 1 - self.p, self.p * self.q / leng)
+        return False
+
+    def local_update(self, pm: PheromoneMatrix, i, j) -> None:
+        pm.blend(i, j, 1 - self.xi, self.xi * self._tau0)
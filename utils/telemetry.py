@@ -0,0 +1,115 @@
+import json
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from time import perf_counter
+
+
+@dataclass
+class IterationStats:
+    """
+    Dataclass describing one iteration of a run using:
+    * iteration number and seconds elapsed since the start of the run;
+    * best, mean and worst path length of the iteration and the best length so far;
+    * normalized entropy of the pheromone trails, 1 for uniform trails and 0 for a single path per point;
+    * seconds spent in every phase: `construct`, `evaluate`, `local_search`, `update` and `refresh`,
+      the first iteration also holds the `distance` matrix build and the rest of the `setup` of the run;
+    * counters: `edges` evaluated by the ants, roulette `draws` and pheromone `writes`.
+    """
+
+    iteration: int
+    elapsed: float
+    best: float
+    mean: float
+    worst: float
+    best_so_far: float
+    entropy: float
+    timings: dict[str, float]
+    counters: dict[str, int]
+
+
+class Observer:
+    """
+    Receives the telemetry of the runs of an `ACO` given as its `observer`:
+    * `start` once per run with the algorithm and the number of points;
+    * `iteration` after every iteration;
+    * `finish` when the run ends or is cancelled.\n
+    Without an observer the algorithm collects nothing.
+    """
+
+    def start(self, aco, size: int) -> None:
+        pass
+
+    def iteration(self, stats: IterationStats) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+class Telemetry(Observer):
+    """Observer keeping the telemetry of the latest run, exported as JSON."""
+
+    def __init__(self) -> None:
+        self.config: dict = {}
+        self.records: list[IterationStats] = []
+
+    def start(self, aco, size: int) -> None:
+        self.config = {"size": size, "ants": aco.ants, "iter": aco.iter, "a": aco.a, "b": aco.b, "p": aco.p,
+                       "q": aco.q, "backend": aco.backend, "nn": aco.nn, "workers": aco.workers, "ls": aco.ls,
+                       "strategy": type(aco.strategy).__name__}
+        self.records = []
+
+    def iteration(self, stats: IterationStats) -> None:
+        self.records.append(stats)
+
+    def totals(self) -> dict[str, dict[str, float]]:
+        """Returns the phase timings and counters summed over all iterations."""
+
+        timings, counters = defaultdict(float), defaultdict(int)
+        for stats in self.records:
+            for phase, seconds in stats.timings.items():
+                timings[phase] += seconds
+            for name, count in stats.counters.items():
+                counters[name] += count
+        return {"timings": dict(timings), "counters": dict(counters)}
+
+    def to_json(self, path: str = None) -> str:
+        """Returns the telemetry as a JSON document, also written to the file if `path` is given."""
+
+        text = json.dumps({"config": self.config, "totals": self.totals(),
+                           "iterations": [asdict(stats) for stats in self.records]}, indent=2)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+
+class Profiler:
+    """Measures the phases and counts the work of one iteration, only created when an observer is set."""
+
+    def __init__(self) -> None:
+        self.counters: dict[str, int] = defaultdict(int)
+        self.timings: dict[str, float] = defaultdict(float)
+        self.writes = 0
+        self._last = perf_counter()
+
+    def lap(self, phase: str) -> None:
+        """Adds the time since the previous lap to the given phase."""
+
+        now = perf_counter()
+        self.timings[phase] += now - self._last
+        self._last = now
+
+    def skip(self) -> None:
+        """Starts the next lap now, leaving the time since the previous lap unmeasured."""
+
+        self._last = perf_counter()
+
+    def take(self) -> tuple[dict[str, float], dict[str, int]]:
+        """Returns the timings and counters of the iteration and starts the next one."""
+
+        timings, counters = dict(self.timings), dict(self.counters)
+        self.timings.clear()
+        self.counters.clear()
+        self._last = perf_counter()
+        return timings, counters
@@ -0,0 +1,97 @@
+from typing import Callable
+import numpy as np
+from utils.base import Base
+from utils.distance import DistanceMatrix
+
+
+def two_opt_delta(d: Callable[[int, int], float], a: int, a2: int, c: int, c2: int) -> float:
+    """Returns the length change of replacing the edges (a, a2) and (c, c2) with (a, c) and (a2, c2)."""
+
+    return d(a, c) + d(a2, c2) - d(a, a2) - d(c, c2)
+
+
+def or_opt_delta(d: Callable[[int, int], float], p: int, s1: int, s2: int, nx: int, u: int, v: int,
+                 reverse: bool = False) -> float:
+    """
+    Returns the length change of moving the chain from `s1` to `s2`, between the points `p` and `nx`,
+    between the points `u` and `v`, reversed if `reverse` is set.
+    """
+
+    first, last = (s2, s1) if reverse else (s1, s2)
+    return d(p, nx) + d(u, first) + d(last, v) - d(p, s1) - d(s2, nx) - d(u, v)
+
+
+class Tour:
+    """
+    Compact closed tour: an int32 array of the point indices in visiting order, without repeating the start,
+    with the edge lengths calculated once on first use.
+    The deltas of 2-opt and Or-opt moves are calculated in O(1) without changing the tour,
+    with the same helpers as `LocalSearch`.
+    """
+
+    __slots__ = ("order", "_dm", "_edges")
+
+    def __init__(self, order, dm: DistanceMatrix) -> None:
+        self.order = np.asarray(order, dtype=np.int32)
+        self._dm = dm
+        self._edges: np.ndarray | None = None
+
+    @classmethod
+    def from_indx(cls, indx: list[int], dm: DistanceMatrix) -> "Tour":
+        """Creates the tour from the closed list form of `Path.indx`, the start repeated at the end."""
+
+        return cls(indx[:-1], dm)
+
+    def tolist(self) -> list[int]:
+        """Returns the closed list form of `Path.indx`."""
+
+        return self.order.tolist() + self.order[:1].tolist()
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __iter__(self):
+        return iter(self.order.tolist())
+
+    def __getitem__(self, k: int) -> int:
+        return int(self.order[k % len(self.order)])
+
+    @property
+    def edges(self) -> np.ndarray:
+        """Returns the length of every edge, the k-th edge leaves the k-th point of the tour."""
+
+        if self._edges is None:
+            self._edges = np.asarray(self._dm[self.order, np.roll(self.order, -1)], dtype=float)
+        return self._edges
+
+    @property
+    def leng(self) -> float:
+        return float(self.edges.sum())
+
+    def __d(self, i: int, j: int) -> float:
+        return float(self._dm.take(i, j))
+
+    def two_opt_delta(self, i: int, j: int) -> float:
+        """
+        Returns the length change of reversing the points between the positions i + 1 and j,
+        which replaces the edges (i, i + 1) and (j, j + 1) with (i, j) and (i + 1, j + 1).
+        Only valid for symmetric distances.
+        """
+
+        return two_opt_delta(self.__d, self[i], self[i + 1], self[j], self[j + 1])
+
+    def or_opt_delta(self, i: int, l: int, j: int, reverse: bool = False) -> float:
+        """
+        Returns the length change of moving the chain of `l` points starting at position i
+        between the positions j and j + 1, outside of the chain, reversed if `reverse` is set.
+        Reversed chains are only valid for symmetric distances.
+        """
+
+        return or_opt_delta(self.__d, self[i - 1], self[i], self[i + l - 1], self[i + l], self[j], self[j + 1], reverse)
+
+    @staticmethod
+    def evaluate(dm: DistanceMatrix, orders: np.ndarray) -> np.ndarray:
+        """Calculates the lengths of a batch of tours given as rows of point orders at once, including the closing edges."""
+
+        orders = np.asarray(orders)
+        return Base._calculate_dist_batch(dm, np.concatenate([orders, orders[:, :1]], axis=1))
@@ -1,12 +1,20 @@
+from typing import TYPE_CHECKING
+from weakref import WeakKeyDictionary
 from numpy import array
-from matplotlib.lines import Line2D
+from utils.distance import DistanceMatrix
 from utils.path import Path
 
+if TYPE_CHECKING:
+    from matplotlib.lines import Line2D
+
 
 class TSP:
     """
     Allows to visualize the Traveling Salesman Problem and paths.
+    The plot is retained: artists are created once per axes, path updates only move the lines and are blitted,
+    and point labels are only shown when at most `LABEL_LIMIT` points are in view.
     """
+    LABEL_LIMIT = 60
     CLR_POINT = "#eb343a"
     CLR_PATH = [
         "#eb343a",
@@ -17,12 +25,26 @@ class TSP:
         "#ebe534",
         "#eb9234",
     ]
+    _owners: WeakKeyDictionary = WeakKeyDictionary()
 
-    def __init__(self, points: list[tuple[int, int]], addresses: list[str] = None, paths: list[Path] = None):
-        """Initializes the problem with points, addresses and paths if any."""
+    def __init__(self, points: list[tuple[int, int]], addresses: list[str] = None, paths: list[Path] = None,
+                 dm: DistanceMatrix = None):
+        """
+        Initializes the problem with points, addresses and paths if any.
+        `dm` is an external distance matrix of the points, such as road distances, Euclidean distances are used otherwise.
+        """
         self._points = points
         self._addresses = addresses if addresses is not None else [f"{i+1}" for i in range(len(points))]
         self._paths = paths if paths is not None else []
+        self._dm = dm
+        self._ax = None
+        self._cids: list[int] = []
+        self._lines: list["Line2D"] = []
+        self._legend = None
+        self._toggles: dict = {}
+        self._texts: list = []
+        self._labels: dict[int, tuple] = {}
+        self._background = None
 
     def get_points(self) -> list[tuple[int, int]]:
         """Returns the list of 2D points of the initial ized problem."""
@@ -32,46 +54,159 @@ class TSP:
         """Returns the list of paths of the initialized problem."""
         return self._paths
 
+    def get_distance_matrix(self) -> DistanceMatrix:
+        """Returns the distance matrix of the problem, calculating the Euclidean one on first use."""
+        if self._dm is None:
+            self._dm = DistanceMatrix.build(self._points)
+        return self._dm
+
+    def set_paths(self, paths: list[Path]) -> None:
+        """Replaces the paths, they are redrawn by the next `show`."""
+        self._paths = paths
+
     def show(self, ax) -> None:
-        """Visualizes the TSP data using the given axes."""
+        """
+        Visualizes the TSP data using the given axes.
+        The artists are created on the first call, later calls only move the path lines and blit them.
+        """
+        if self._ax is not ax or len(self._lines) != len(self._paths):
+            self.__build(ax)
+        else:
+            self.__update_paths()
+            self.__blit()
+
+    def __build(self, ax) -> None:
+        """Creates all artists on the given axes, taking them over from the TSP shown there before."""
+        previous = TSP._owners.get(ax)
+        if previous is not None and previous is not self:
+            previous.__release()
+        self.__release()
+        TSP._owners[ax] = self
+        self._ax = ax
         ax.clear()
-        ax.set_xlim(0, 1000)
-        ax.set_ylim(0, 1000)
+        xy = array(self._points, dtype=float).reshape(-1, 2)
+        lo, hi = (xy.min(axis=0), xy.max(axis=0)) if len(xy) else ((0, 0), (0, 0))
+        ax.set_xlim(min(0, lo[0]), max(1000, hi[0]))
+        ax.set_ylim(min(0, lo[1]), max(1000, hi[1]))
         self.__draw_points(ax)
-        lines = self.__draw_paths(ax)
-        self.__draw_legend(ax, lines)
-        ax.figure.canvas.draw()
+        self._lines = self.__draw_paths(ax)
+        self.__draw_legend(ax, self._lines)
+        canvas = ax.figure.canvas
+        self._cids = [canvas.mpl_connect("draw_event", self.__on_draw),
+                      canvas.mpl_connect("pick_event", self.__on_pick)]
+        ax.callbacks.connect("xlim_changed", self.__on_limits)
+        ax.callbacks.connect("ylim_changed", self.__on_limits)
+        self.__cull_labels()
+        canvas.draw_idle()
+
+    def __release(self) -> None:
+        """Disconnects the event handlers from the axes shown last."""
+        if self._ax is not None:
+            for cid in self._cids:
+                self._ax.figure.canvas.mpl_disconnect(cid)
+        self._ax = None
+        self._cids = []
+        self._lines = []
+        self._labels = {}
+        self._background = None
 
     def __draw_points(self, ax) -> None:
-        """Draws 2D points on the given axes."""
+        """Draws 2D points on the given axes, their labels are created by `__cull_labels`."""
         ax.scatter(*array(self._points).T, zorder=1, color=self.CLR_POINT, label=f"Points ({len(self._points)})")
-        for idx, (p, label) in enumerate(zip(self._points, self._addresses)):
-            ax.annotate(label, p, ha="center", textcoords="offset points", xytext=(0, 4), fontsize=8)
-            ax.annotate(f"({p[0]}; {p[1]})", p, ha="center", va="top", textcoords="offset points", xytext=(0, -4), fontsize=6)
 
-    def __draw_paths(self, ax) -> list[Line2D]:
-        """Draws all given paths on the given axes."""
+    def __cull_labels(self) -> bool:
+        """
+        Shows the labels of the points within the view if there are at most `LABEL_LIMIT` of them, hides the others.
+        Returns True if any label changed.
+        """
+        (x0, x1), (y0, y1) = sorted(self._ax.get_xlim()), sorted(self._ax.get_ylim())
+        shown = {i for i, (x, y) in enumerate(self._points) if x0 <= x <= x1 and y0 <= y <= y1}
+        if len(shown) > self.LABEL_LIMIT:
+            shown = set()
+        changed = False
+        for i in shown - self._labels.keys():
+            p = self._points[i]
+            self._labels[i] = (
+                self._ax.annotate(self._addresses[i], p, ha="center", textcoords="offset points", xytext=(0, 4), fontsize=8),
+                self._ax.annotate(f"({p[0]}; {p[1]})", p, ha="center", va="top", textcoords="offset points", xytext=(0, -4), fontsize=6),
+            )
+            changed = True
+        for i, texts in self._labels.items():
+            for text in texts:
+                if text.get_visible() != (i in shown):
+                    text.set_visible(i in shown)
+                    changed = True
+        return changed
+
+    def __draw_paths(self, ax) -> list["Line2D"]:
+        """Draws all given paths on the given axes as animated lines, redrawn by blitting."""
         lines = []
         for i, path in enumerate(self._paths):
-            points = [self._points[idx] for idx in path.indx]
-            (line,) = ax.plot(*array(points).T, ls="--", zorder=0, color=self.CLR_PATH[i % len(self.CLR_PATH)],
-                              label=f"{path.name} ({path.leng:.2f})")
+            points = array([self._points[idx] for idx in path.indx]).reshape(-1, 2)
+            (line,) = ax.plot(*points.T, ls="--", zorder=0, color=self.CLR_PATH[i % len(self.CLR_PATH)],
+                              label=f"{path.name} ({path.leng:.2f})", animated=True)
             lines.append(line)
         return lines
 
-    def __draw_legend(self, ax, lines: list[Line2D]) -> None:
-        """Draws the legend on the given axes, with interactive toggle for paths."""
-        if lines:
-            legend = ax.legend()
-            lined = {legline: origline for legline, origline in zip(legend.get_lines(), lines)}
-
-            def on_pick(event):
-                legline = event.artist
-                origline = lined[legline]
-                visible = not origline.get_visible()
-                origline.set_visible(visible)
-                legline.set_alpha(1.0 if visible else 0.2)
-                ax.figure.canvas.draw()
-            ax.figure.canvas.mpl_connect("pick_event", on_pick)
-        else:
-            ax.legend()
+    def __update_paths(self) -> None:
+        """Moves the path lines to the current paths and updates their legend entries."""
+        for line, text, path in zip(self._lines, self._texts, self._paths):
+            points = array([self._points[idx] for idx in path.indx]).reshape(-1, 2)
+            line.set_data(points[:, 0], points[:, 1])
+            text.set_text(f"{path.name} ({path.leng:.2f})")
+
+    def __draw_legend(self, ax, lines: list["Line2D"]) -> None:
+        """
+        Draws the legend on the given axes, its path entries toggle the paths when clicked.
+        The entries of the paths are looked up by their lines, the points have an entry of their own.
+        """
+        self._legend = ax.legend()
+        self._legend.set_animated(bool(lines))
+        handles, _ = ax.get_legend_handles_labels()
+        entries = dict(zip(handles, zip(self._legend.legend_handles, self._legend.get_texts())))
+        self._toggles = {}
+        self._texts = []
+        for origline in lines:
+            legline, text = entries[origline]
+            legline.set_picker(5)
+            self._toggles[legline] = origline
+            self._texts.append(text)
+
+    def __draw_animated(self) -> None:
+        """Draws the path lines and the legend over the current canvas."""
+        for line in self._lines:
+            self._ax.draw_artist(line)
+        if self._lines:
+            self._ax.draw_artist(self._legend)
+
+    def __blit(self) -> None:
+        """Redraws only the animated artists over the saved background, or the whole figure if blitting is unavailable."""
+        canvas = self._ax.figure.canvas
+        if self._background is None or not canvas.supports_blit:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self._background)
+        self.__draw_animated()
+        canvas.blit(self._ax.bbox)
+
+    def __on_draw(self, event) -> None:
+        """Saves the background after a full redraw and draws the animated artists over it."""
+        canvas = self._ax.figure.canvas
+        if canvas.supports_blit:
+            self._background = canvas.copy_from_bbox(self._ax.bbox)
+        self.__draw_animated()
+
+    def __on_limits(self, ax) -> None:
+        """Culls the point labels after zooming or panning."""
+        if self.__cull_labels():
+            ax.figure.canvas.draw_idle()
+
+    def __on_pick(self, event) -> None:
+        """Toggles the path of the clicked legend entry."""
+        origline = self._toggles.get(event.artist)
+        if origline is None:
+            return
+        visible = not origline.get_visible()
+        origline.set_visible(visible)
+        event.artist.set_alpha(1.0 if visible else 0.2)
+        self.__blit()
@@ -0,0 +1,113 @@
+import os
+from dataclasses import dataclass
+import numpy as np
+from utils.addresses import AddressCatalogue
+from utils.distance import DenseDistance, DistanceMatrix
+
+
+@dataclass
+class Instance:
+    """
+    Dataclass describing a problem read from a TSPLIB file using:
+    * instance name;
+    * list of 2D points, or None if the file has no coordinates;
+    * distance matrix, directed for ATSP files;
+    * comment of the file;
+    * names of the points (optional).
+    """
+
+    name: str
+    points: list[tuple[float, float]] | None
+    dm: DistanceMatrix
+    comment: str = ""
+    names: list[str] = None
+
+
+class TSPLIB:
+    """
+    Reader of TSPLIB files, supports EUC_2D, CEIL_2D and EXPLICIT edge weights.
+    Also reads named points from CSV files.
+    Coordinate distances are rounded the way TSPLIB defines them, so lengths match the published optima.
+    """
+
+    FORMATS = ("FULL_MATRIX", "UPPER_ROW", "LOWER_ROW", "UPPER_DIAG_ROW", "LOWER_DIAG_ROW")
+
+    @staticmethod
+    def load(path: str) -> Instance:
+        """Reads the instance from the file."""
+
+        with open(path, encoding="utf-8") as f:
+            return TSPLIB.parse(f.read())
+
+    @staticmethod
+    def load_csv(path: str) -> Instance:
+        """
+        Reads named 2D points from a CSV file with `name,x,y` rows, an optional header row is skipped.
+        Distances between the points are Euclidean.
+        """
+
+        names, points = [], []
+        for block_names, block in AddressCatalogue.stream_csv(path, dtype=float):
+            names += block_names
+            points += [(x, y) for x, y in block.tolist()]
+        name = os.path.splitext(os.path.basename(path))[0]
+        return Instance(name, points, DistanceMatrix.build(points), names=names)
+
+    @staticmethod
+    def parse(text: str) -> Instance:
+        """Reads the instance from the contents of a TSPLIB file."""
+
+        spec: dict[str, str] = {}
+        sections: dict[str, list[str]] = {}
+        section = None
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line == "EOF":
+                continue
+            key, sep, value = line.partition(":")
+            if sep:
+                spec[key.strip()] = value.strip()
+                section = None
+            elif line.endswith("_SECTION"):
+                section = sections.setdefault(line, [])
+            elif section is not None:
+                section.extend(line.split())
+            else:
+                raise ValueError(f"Unexpected TSPLIB line {line!r}")
+
+        size = int(spec["DIMENSION"])
+        weights = spec.get("EDGE_WEIGHT_TYPE", "EXPLICIT")
+        coords = sections.get("NODE_COORD_SECTION") or sections.get("DISPLAY_DATA_SECTION")
+        points = None
+        if coords:
+            xy = np.asarray(coords, dtype=float).reshape(size, 3)[:, 1:]
+            points = [(float(x), float(y)) for x, y in xy]
+        if weights in ("EUC_2D", "CEIL_2D"):
+            if points is None:
+                raise ValueError(f"{weights} instance without NODE_COORD_SECTION")
+            d = np.empty((size, size), dtype=np.float32)
+            for start in range(0, size, 512):
+                block = xy[start:start + 512, None, :] - xy[None, :, :]
+                block = np.hypot(block[..., 0], block[..., 1])
+                d[start:start + 512] = np.ceil(block) if weights == "CEIL_2D" else np.floor(block + 0.5)
+        elif weights == "EXPLICIT":
+            d = TSPLIB.__explicit(spec.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX"),
+                                  np.asarray(sections["EDGE_WEIGHT_SECTION"], dtype=float), size)
+        else:
+            raise ValueError(f"Unsupported EDGE_WEIGHT_TYPE {weights!r}")
+        symmetric = spec.get("TYPE", "TSP") != "ATSP"
+        return Instance(spec.get("NAME", ""), points, DenseDistance(np.asarray(d, dtype=np.float32), symmetric), spec.get("COMMENT", ""))
+
+    @staticmethod
+    def __explicit(fmt: str, values: np.ndarray, size: int) -> np.ndarray:
+        """Builds the full matrix from the edge weights of the given format."""
+
+        if fmt not in TSPLIB.FORMATS:
+            raise ValueError(f"Unsupported EDGE_WEIGHT_FORMAT {fmt!r}")
+        if fmt == "FULL_MATRIX":
+            return values.reshape(size, size)
+        d = np.zeros((size, size))
+        diag = fmt.endswith("DIAG_ROW")
+        i, j = np.triu_indices(size, 0 if diag else 1) if fmt.startswith("UPPER") else np.tril_indices(size, 0 if diag else -1)
+        d[i, j] = values[:len(i)]
+        return np.maximum(d, d.T)
@@ -0,0 +1,34 @@
+import json
+from dataclasses import dataclass
+
+
+@dataclass
+class Tuning:
+    """
+    Best ACO settings per instance-size bucket, as written by `tune.py`.
+    Every bucket holds its upper bound on the number of points and the `ants, iter, a, b, p, q` settings,
+    the last bucket also covers all larger instances.
+    """
+
+    buckets: list[tuple[int, dict]]
+
+    KEYS = ("ants", "iter", "a", "b", "p", "q")
+
+    @staticmethod
+    def load(path: str) -> "Tuning":
+        """Reads the settings from the JSON file written by `tune.py`."""
+
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        buckets = sorted((int(b["max_size"]), {k: b["config"][k] for k in Tuning.KEYS}) for b in data["buckets"])
+        if not buckets:
+            raise ValueError(f"{path!r} holds no tuned buckets")
+        return Tuning(buckets)
+
+    def config(self, size: int) -> dict:
+        """Returns the settings of the smallest bucket holding `size` points."""
+
+        for max_size, config in self.buckets:
+            if size <= max_size:
+                return dict(config)
+        return dict(self.buckets[-1][1])
@@ -0,0 +1,36 @@
+import numpy as np
+from utils.base import Base
+from utils.distance import DistanceMatrix
+
+
+class WarmStart:
+    """
+    Pheromone trails and best path of a previous solve, keyed by the identity of the points
+    (for example their addresses), to restart the colony when points are added or removed.
+    """
+
+    def __init__(self, keys: list, trails: np.ndarray, indx: list[int]) -> None:
+        self.keys = list(keys)
+        self.trails = trails
+        self.indx = indx
+
+    def adapt(self, keys: list, dm: DistanceMatrix) -> tuple[np.ndarray, list[int]]:
+        """
+        Maps the trails and the path onto the new points with the distance matrix `dm`.
+        Removed points are dropped, trails of new points start at the mean of the old ones,
+        and new points are inserted into the path at their cheapest position.
+        """
+
+        old = {k: i for i, k in enumerate(self.keys)}
+        kept = [(i, old[k]) for i, k in enumerate(keys) if k in old]
+        new = [i for i, k in enumerate(keys) if k not in old]
+        l = len(keys)
+        off_diagonal = ~np.eye(len(self.trails), dtype=bool)
+        trails = np.full((l, l), self.trails[off_diagonal].mean() if off_diagonal.any() else 1.0)
+        if kept:
+            new_i, old_i = (np.array(side) for side in zip(*kept))
+            trails[np.ix_(new_i, new_i)] = self.trails[np.ix_(old_i, old_i)]
+        to_new = {o: n for n, o in kept}
+        indx = [to_new[c] for c in self.indx[:-1] if c in to_new]
+        indx = Base._cheapest_insertion(dm, indx + indx[:1], new)
+        return trails, indx